@@ -0,0 +1,135 @@
+import random
+import socketserver
+import threading
+import time
+
+
+class FakeSMTPServer:
+    """
+    in-process SMTP server for benchmarks
+
+    accepts EHLO/HELO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA, RSET, NOOP and
+    QUIT on plain TCP (no STARTTLS, so senders must use use_tls=False).
+    every command waits `latency` seconds before replying. RCPT commands
+    fail with a transient 451 or permanent 550 at the configured rates,
+    and `disconnect_rate` drops the connection after DATA instead of
+    answering
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        transient_rate=0.0,
+        permanent_rate=0.0,
+        disconnect_rate=0.0,
+        seed=None,
+    ):
+        self.latency = latency
+        self.transient_rate = transient_rate
+        self.permanent_rate = permanent_rate
+        self.disconnect_rate = disconnect_rate
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.stats = {"connections": 0, "messages": 0, "bytes": 0, "rejected": 0}
+
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                server._handle(self.rfile, self.wfile)
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+            request_queue_size = 256  # async senders open many sessions at once
+
+        self._server = Server((host, port), Handler)
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _chance(self, rate):
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.random.random() < rate
+
+    def _handle(self, rfile, wfile):
+        with self.lock:
+            self.stats["connections"] += 1
+
+        def reply(line):
+            if self.latency:
+                time.sleep(self.latency)
+            wfile.write(line.encode("ascii") + b"\r\n")
+            wfile.flush()
+
+        reply("220 fake-smtp ready")
+        while True:
+            line = rfile.readline()
+            if not line:
+                return
+            command = line.strip().decode("latin-1")
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                wfile.write(b"250-fake-smtp\r\n250-8BITMIME\r\n")
+                reply("250 AUTH PLAIN LOGIN")
+            elif verb == "HELO":
+                reply("250 fake-smtp")
+            elif verb == "AUTH":
+                if command.upper().startswith("AUTH LOGIN"):
+                    reply("334 VXNlcm5hbWU6")
+                    rfile.readline()
+                    reply("334 UGFzc3dvcmQ6")
+                    rfile.readline()
+                reply("235 Authentication successful")
+            elif verb == "RCPT":
+                if self._chance(self.transient_rate):
+                    self._count("rejected")
+                    reply("451 Try again later")
+                elif self._chance(self.permanent_rate):
+                    self._count("rejected")
+                    reply("550 No such user")
+                else:
+                    reply("250 OK")
+            elif verb == "DATA":
+                reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                while True:
+                    data_line = rfile.readline()
+                    if not data_line or data_line == b".\r\n":
+                        break
+                    size += len(data_line)
+                if self._chance(self.disconnect_rate):
+                    return
+                with self.lock:
+                    self.stats["messages"] += 1
+                    self.stats["bytes"] += size
+                reply("250 OK queued")
+            elif verb == "QUIT":
+                reply("221 Bye")
+                return
+            else:
+                reply("250 OK")
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
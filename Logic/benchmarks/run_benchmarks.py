@@ -0,0 +1,332 @@
+"""
+throughput benchmarks for the load -> preprocess -> categorise -> render ->
+send pipeline
+
+run from the Logic directory:
+
+    python -m benchmarks.run_benchmarks --sizes 1000,10000,100000
+    python -m benchmarks.run_benchmarks --sizes 1000000 --send-limit 0
+
+results are written as JSON so runs can be compared across commits
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_smtp_server import FakeSMTPServer
+from core.batch_renderer import render_dataframe
+from core.data_processor import DataProcessor
+from core.email_manager import EmailManager
+from core.frame_cache import FrameCache
+from core.message_renderer import MessageRenderer
+from core.render_context import RenderContext
+from core.template_manager import TemplateManager
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie"]
+LAST_NAMES = ["Smith", "Jones", "Patel", "Khan", "Brown", "Wilson", "Evans", "Ali"]
+
+
+def generate_sheet(rows, extra_columns=10, seed=0):
+    # synthetic apprentice export shaped like the real coach spreadsheets
+    rng = np.random.default_rng(seed)
+    first = rng.choice(FIRST_NAMES, rows)
+    last = rng.choice(LAST_NAMES, rows)
+    ids = np.arange(rows).astype(str)
+
+    data = {
+        "Apprentice": pd.Series(first) + " " + pd.Series(last),
+        "First Name": first,
+        "email": pd.Series(first).str.lower() + "." + ids + "@example.com",
+        "Off the job": pd.Series(rng.integers(0, 60, rows)).astype(str) + " hrs",
+        "Last attended": pd.Series(rng.integers(0, 90, rows)).astype(str) + " days",
+        "Manager": rng.choice(LAST_NAMES, rows),
+    }
+    for i in range(extra_columns):
+        data[f"Extra {i}"] = rng.integers(0, 1000, rows)
+
+    return pd.DataFrame(data)
+
+
+def timed(results, rows, stage, func, count=None):
+    started = time.perf_counter()
+    value = func()
+    seconds = time.perf_counter() - started
+    count = rows if count is None else count
+    results.append(
+        {
+            "rows": rows,
+            "stage": stage,
+            "count": count,
+            "seconds": round(seconds, 6),
+            "per_second": round(count / seconds, 1) if seconds > 0 else None,
+        }
+    )
+    print(f"{rows:>9} rows  {stage:<28} {seconds:9.3f}s  ({count} items)")
+    return value
+
+
+def bench_send(results, rows, records, templates, args, stage, **config):
+    # send records through EmailManager and record throughput
+    manager = EmailManager()
+    manager.configure(
+        {
+            "smtp_server": config.pop("host", "127.0.0.1"),
+            "smtp_port": config.pop("port", 0),
+            "sender_email": "coach@example.com",
+            "sender_password": "secret",
+            "use_tls": False,
+            "rate_profile": "unlimited",
+            "retry_base_delay": 0.05,
+            **config,
+        }
+    )
+
+    engine = config.get("engine", "threaded")
+    if engine == "async":
+        send = lambda: manager.send_bulk_emails_async(records, templates)
+    else:
+        send = lambda: manager.send_bulk_emails(records, templates)
+
+    timed(results, rows, stage, send, count=len(records))
+    results[-1]["status"] = manager.get_status()
+    results[-1]["render"] = manager.get_render_stats()
+
+
+def bench_parse(results, rows, path, kind, template_fields):
+    # parse only: pandas' readers, the fast engines (pyarrow CSV / calamine
+    # XLSX, when installed), and the fast engines with column pruning
+    for stage, engine, fields in (
+        ("pandas", "pandas", None),
+        ("fast", "auto", None),
+        ("fast_pruned", "auto", template_fields),
+    ):
+        reader = DataProcessor(ingest_engine=engine)
+        reader.template_fields = fields
+        timed(results, rows, f"parse_{kind}_{stage}", lambda: reader._read_file(path))
+
+
+def run(args):
+    results = []
+    template_manager = TemplateManager()
+    templates = template_manager.get_all_templates()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.sizes:
+            df = timed(results, rows, "generate", lambda: generate_sheet(rows))
+            csv_path = os.path.join(workdir, f"apprentices_{rows}.csv")
+            timed(results, rows, "write_csv", lambda: df.to_csv(csv_path, index=False))
+
+            # a fresh cache directory, so loads are timed as a first open
+            cache = FrameCache(os.path.join(workdir, "cache"))
+            processor = DataProcessor(frame_cache=cache)
+            ok, message = timed(
+                results, rows, "load_csv", lambda: processor.load_file(csv_path)
+            )
+            if not ok:
+                raise RuntimeError(message)
+
+            bench_parse(
+                results, rows, csv_path, "csv", template_manager.get_all_placeholders
+            )
+
+            memory = processor.memory_report()
+            results.append({"rows": rows, "stage": "memory", **memory})
+            print(f"{rows:>9} rows  {'memory':<28} {memory['total'] / 1e6:8.1f}MB")
+
+            if args.xlsx and rows <= args.xlsx_limit:
+                xlsx_path = os.path.join(workdir, f"apprentices_{rows}.xlsx")
+                df.to_excel(xlsx_path, index=False)
+                timed(
+                    results,
+                    rows,
+                    "load_xlsx",
+                    lambda: DataProcessor(frame_cache=cache).load_file(xlsx_path),
+                )
+                bench_parse(
+                    results,
+                    rows,
+                    xlsx_path,
+                    "xlsx",
+                    template_manager.get_all_placeholders,
+                )
+
+            raw = processor.raw_dataframe
+            processed = timed(
+                results, rows, "preprocess", lambda: processor.preprocess_data(raw)
+            )
+            timed(
+                results,
+                rows,
+                "categorise",
+                lambda: processor.category_rules.categorize_columns(
+                    processed["off_the_job"].to_numpy(),
+                    processed["last_attended"].to_numpy(),
+                ),
+            )
+
+            records = processor.get_processed_data()
+            sample = records[: args.render_limit]
+
+            def render_placeholders():
+                context = RenderContext()
+                for record in sample:
+                    template = templates[
+                        template_manager.determine_template_type(record)
+                    ]
+                    template_manager.replace_placeholders(
+                        template["subject"], record, context
+                    )
+                    template_manager.replace_placeholders(
+                        template["body"], record, context
+                    )
+
+            timed(
+                results,
+                rows,
+                "render_placeholders",
+                render_placeholders,
+                count=len(sample),
+            )
+
+            email_manager = EmailManager()
+            renderer = MessageRenderer(
+                "coach@example.com",
+                templates,
+                email_manager._determine_template_type,
+                email_manager._replace_placeholders,
+            )
+            timed(
+                results,
+                rows,
+                "render_mime",
+                lambda: [renderer.render(record) for record in sample],
+                count=len(sample),
+            )
+            results[-1]["render"] = renderer.get_stats()
+
+            # column-wise rendering of every row, for comparison with the
+            # per-record render_placeholders stage above
+            timed(
+                results,
+                rows,
+                "render_batch",
+                lambda: render_dataframe(
+                    processor.get_dataframe(), templates, rules=processor.category_rules
+                ),
+            )
+
+            send_records = records[: args.send_limit]
+            if not send_records:
+                continue
+
+            bench_send(
+                results,
+                rows,
+                send_records,
+                templates,
+                args,
+                "send_null",
+                transport="null",
+                pool_size=args.pool_size,
+            )
+
+            with FakeSMTPServer(
+                latency=args.latency,
+                transient_rate=args.transient_rate,
+                permanent_rate=args.permanent_rate,
+                disconnect_rate=args.disconnect_rate,
+                seed=0,
+            ) as server:
+                for pool_size in sorted({1, args.pool_size}):
+                    bench_send(
+                        results,
+                        rows,
+                        send_records,
+                        templates,
+                        args,
+                        f"send_smtp_pool{pool_size}",
+                        host=server.host,
+                        port=server.port,
+                        pool_size=pool_size,
+                    )
+                bench_send(
+                    results,
+                    rows,
+                    send_records,
+                    templates,
+                    args,
+                    f"send_smtp_async{args.max_in_flight}",
+                    host=server.host,
+                    port=server.port,
+                    engine="async",
+                    max_in_flight=args.max_in_flight,
+                )
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except Exception:
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Email_Auto pipeline benchmarks")
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        type=lambda value: [int(size) for size in value.split(",")],
+        help="comma separated row counts (up to 1000000)",
+    )
+    parser.add_argument("--render-limit", type=int, default=10000)
+    parser.add_argument("--send-limit", type=int, default=1000)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--max-in-flight", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--transient-rate", type=float, default=0.0)
+    parser.add_argument("--permanent-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--xlsx", action="store_true", help="also time .xlsx loads")
+    parser.add_argument("--xlsx-limit", type=int, default=100000)
+    parser.add_argument("--output", default="benchmark_results.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "settings": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+APP_DIRECTORY = "ApprenticeEmailAutomation"
+
+
+def app_data_dir(*parts):
+    # a directory under the per-user application data directory, whatever
+    # the working directory is. created if it does not exist
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    directory = os.path.join(base, APP_DIRECTORY, *parts)
+    os.makedirs(directory, exist_ok=True)
+    return directory
@@ -0,0 +1,152 @@
+import asyncio
+import base64
+import re
+import smtplib
+import socket
+import ssl
+
+CRLF = b"\r\n"
+
+
+class AsyncSMTPConnection:
+    """
+    minimal SMTP client on asyncio streams
+    errors are raised as the matching smtplib exceptions so callers can
+    handle both send engines the same way
+    """
+
+    def __init__(self, host, port, timeout=30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+        self.esmtp_features = {}
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        code, msg = await self._read_reply()
+        if code != 220:
+            raise smtplib.SMTPConnectError(code, msg)
+        await self.ehlo()
+
+    async def _read_reply(self):
+        # read a (possibly multi-line) reply and return (code, message)
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line:
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+            try:
+                code = int(line[:3])
+            except ValueError:
+                raise smtplib.SMTPServerDisconnected(f"Malformed reply: {line!r}")
+            lines.append(line[4:].strip())
+            if line[3:4] != b"-":
+                break
+        return code, b"\n".join(lines)
+
+    async def command(self, cmd, expected=(250,)):
+        # send a single command and check the reply code
+        self.writer.write(cmd + CRLF)
+        await self.writer.drain()
+        code, msg = await self._read_reply()
+        if code not in expected:
+            raise smtplib.SMTPResponseException(code, msg)
+        return code, msg
+
+    async def ehlo(self):
+        local_hostname = socket.getfqdn().encode("ascii", "ignore") or b"localhost"
+        code, msg = await self.command(b"EHLO " + local_hostname)
+
+        self.esmtp_features = {}
+        for line in msg.decode("latin-1").split("\n")[1:]:
+            parts = line.split(None, 1)
+            if parts:
+                self.esmtp_features[parts[0].lower()] = (
+                    parts[1] if len(parts) > 1 else ""
+                )
+
+    async def starttls(self):
+        await self.command(b"STARTTLS", expected=(220,))
+        await self.writer.start_tls(
+            ssl.create_default_context(), server_hostname=self.host
+        )
+        await self.ehlo()
+
+    async def login(self, user, password):
+        mechanisms = self.esmtp_features.get("auth", "").upper().split()
+
+        if "PLAIN" in mechanisms or not mechanisms:
+            token = base64.b64encode(f"\0{user}\0{password}".encode("utf-8"))
+            code, msg = await self.command(b"AUTH PLAIN " + token, (235, 503, 535))
+        else:
+            await self.command(b"AUTH LOGIN", expected=(334,))
+            await self.command(base64.b64encode(user.encode("utf-8")), expected=(334,))
+            code, msg = await self.command(
+                base64.b64encode(password.encode("utf-8")), (235, 503, 535)
+            )
+
+        if code not in (235, 503):
+            raise smtplib.SMTPAuthenticationError(code, msg)
+
+    async def sendmail(self, from_addr, to_addr, message):
+        # one MAIL/RCPT/DATA transaction for a single recipient
+        if isinstance(message, str):
+            message = message.encode("utf-8")
+
+        try:
+            code, msg = await self.command(f"MAIL FROM:<{from_addr}>".encode("utf-8"))
+        except smtplib.SMTPResponseException as e:
+            await self._rset()
+            raise smtplib.SMTPSenderRefused(e.smtp_code, e.smtp_error, from_addr)
+
+        try:
+            await self.command(
+                f"RCPT TO:<{to_addr}>".encode("utf-8"), expected=(250, 251)
+            )
+        except smtplib.SMTPResponseException as e:
+            await self._rset()
+            raise smtplib.SMTPRecipientsRefused({to_addr: (e.smtp_code, e.smtp_error)})
+
+        try:
+            await self.command(b"DATA", expected=(354,))
+        except smtplib.SMTPResponseException as e:
+            await self._rset()
+            raise smtplib.SMTPDataError(e.smtp_code, e.smtp_error)
+
+        self.writer.write(_prepare_data(message))
+        await self.writer.drain()
+        code, msg = await self._read_reply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, msg)
+
+    async def _rset(self):
+        try:
+            await self.command(b"RSET")
+        except smtplib.SMTPServerDisconnected:
+            raise
+        except Exception:
+            pass
+
+    async def quit(self):
+        try:
+            await self.command(b"QUIT", expected=(221,))
+        finally:
+            self.close()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def _prepare_data(message):
+    # normalise line endings, dot-stuff and terminate the DATA payload
+    data = re.sub(rb"(?:\r\n|\n|\r(?!\n))", CRLF, message)
+    data = re.sub(rb"(?m)^\.", b"..", data)
+    if not data.endswith(CRLF):
+        data += CRLF
+    return data + b"." + CRLF
@@ -0,0 +1,212 @@
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from core.category_rules import CategoryRules
+from core.data_processor import NUMERIC_FIELDS, TEXT_DEFAULTS
+from core.record_view import NUMERIC_ALIASES
+from core.render_context import RenderContext
+from core.template_compiler import compile_template
+
+
+def render_dataframe(df, templates, context=None, rules=None):
+    """
+    render the subject and body of every row of a processed DataFrame
+
+    returns a DataFrame with "template", "subject" and "body" columns on the
+    same index as df. rows are grouped by their template type and each group
+    is built with column-wise string concatenation over the compiled
+    template segments, so nothing is done per record in Python.
+    values follow EmailManager._generate_replacements, so the result can be
+    handed to send_bulk_emails(rendered=...) in place of per-record rendering.
+    campaign-wide values come from context (a RenderContext) and template
+    types from rules (a CategoryRules)
+    """
+    count = len(df)
+    template_types = _template_types(df, rules or CategoryRules.from_file())
+    # object arrays start out as None
+    subjects = np.empty(count, dtype=object)
+    bodies = np.empty(count, dtype=object)
+
+    values = _ReplacementColumns(df, context or RenderContext())
+    codes, types = pd.factorize(template_types)
+    for code, template_type in enumerate(types):
+        template = templates.get(template_type, templates.get("on_track", {}))
+        if not template:
+            # left empty so the send path raises its usual "No template" error
+            continue
+
+        rows = np.flatnonzero(codes == code)
+        subjects[rows] = _render_rows(template.get("subject", ""), values, rows)
+        bodies[rows] = _render_rows(template.get("body", ""), values, rows)
+
+    # object columns: converting to pandas' string dtype only costs time
+    return pd.DataFrame(
+        {"template": template_types, "subject": subjects, "body": bodies},
+        index=df.index,
+        dtype=object,
+    )
+
+
+def _render_rows(text, values, rows):
+    """
+    join the literal segments and placeholder columns of the given rows
+    each row is joined once, instead of growing every row per segment
+    """
+    columns = []
+    for literal, key in compile_template(text).segments:
+        if literal:
+            columns.append(repeat(literal, len(rows)))
+        if key is not None:
+            column = values.get(key[1:-1])
+            if column is None:
+                column = repeat(key, len(rows))
+            else:
+                column = column[rows]
+            columns.append(column)
+
+    if not columns:
+        columns.append(repeat("", len(rows)))
+    result = np.empty(len(rows), dtype=object)
+    result[:] = list(map("".join, zip(*columns)))
+    return result
+
+
+def _template_types(df, rules):
+    # vectorized EmailManager._determine_template_type
+    category = df.get("off_track_category")
+    if (
+        isinstance(getattr(category, "dtype", None), pd.CategoricalDtype)
+        and not category.isna().any()
+        and set(category.cat.categories).issubset(rules.categories)
+    ):
+        # preprocessed data: every row already has a valid category
+        return category.to_numpy(dtype=object)
+
+    hours, days = _int_pair(
+        _column(df, "off_the_job", 0), _column(df, "last_attended", 0)
+    )
+    calculated = rules.categorize_columns(hours, days)
+
+    if "off_track_category" not in df.columns:
+        return calculated
+
+    category = df["off_track_category"].to_numpy(dtype=object)
+    valid = pd.Series(category).isin(rules.categories).to_numpy()
+    return np.where(valid, category, calculated)
+
+
+class _ReplacementColumns:
+    """
+    placeholder name -> numpy array of replacement strings, one per row
+    columns are built the first time a template asks for them
+    """
+
+    def __init__(self, df, context):
+        self.df = df
+        self.context = context
+        self._cache = {}
+
+    def get(self, name):
+        if name not in self._cache:
+            self._cache[name] = self._build(name)
+        return self._cache[name]
+
+    def _build(self, name):
+        df = self.df
+        # hours_behind/days_absent render the same values as their fields
+        name = NUMERIC_ALIASES.get(name, name)
+
+        if name in TEXT_DEFAULTS:
+            return _as_str(_column(df, name, TEXT_DEFAULTS[name]))
+        if name in NUMERIC_FIELDS:
+            return _as_str(_column(df, name, 0))
+        if name == "hours_plural":
+            hours = _column(df, "off_the_job", 0).to_numpy()
+            return np.where(hours == 1, "hour", "hours").astype(object)
+        if name == "days_plural":
+            days = _column(df, "last_attended", 0).to_numpy()
+            return np.where(days == 1, "day", "days").astype(object)
+        if name in df.columns:
+            return _as_text(df[name])
+
+        # campaign-wide values sit under the record columns
+        value = self.context.values.get(f"{{{name}}}")
+        if value is not None:
+            return np.full(len(df), value, dtype=object)
+        return None
+
+
+def _column(df, name, default):
+    # like record.get(name, default) for every row at once
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def _int_pair(hours, days):
+    """
+    int(value) if value else 0 for two columns, where a value that cannot be
+    converted zeroes both numbers of its row, as in the per-record code
+    """
+    hours = _to_int(hours)
+    days = _to_int(days)
+    failed = hours.isna().to_numpy() | days.isna().to_numpy()
+
+    hours = np.where(failed, 0, hours.fillna(0).to_numpy()).astype(np.int64)
+    days = np.where(failed, 0, days.fillna(0).to_numpy()).astype(np.int64)
+    return hours, days
+
+
+def _to_int(series):
+    if series.dtype.kind in "iub":
+        return series.astype(np.int64)
+    return series.map(_int_or_none)
+
+
+def _int_or_none(value):
+    try:
+        return int(value) if value else 0
+    except (ValueError, TypeError):
+        return None
+
+
+def _as_str(series):
+    # str(value) for every row
+    if _few_distinct(series):
+        return _str_by_value(series)
+    if _all_strings(series):
+        return series.to_numpy(dtype=object)
+    return series.map(str).to_numpy(dtype=object)
+
+
+def _as_text(series):
+    # str(value), with None rendered as an empty string
+    if _few_distinct(series):
+        return _str_by_value(series)
+    if _all_strings(series):
+        return series.to_numpy(dtype=object)
+    return series.map(lambda value: "" if value is None else str(value)).to_numpy(
+        dtype=object
+    )
+
+
+def _few_distinct(series):
+    # numbers and categories repeat, so converting each value once pays off
+    kind = series.dtype.kind in "iub" or isinstance(series.dtype, pd.CategoricalDtype)
+    return kind and not series.isna().any()
+
+
+def _str_by_value(series):
+    # str() of each distinct value, spread back over the rows
+    codes, uniques = pd.factorize(series)
+    return np.array([str(value) for value in uniques.tolist()], dtype=object)[codes]
+
+
+def _all_strings(series):
+    # text columns without missing values need no conversion at all
+    return (
+        pd.api.types.infer_dtype(series, skipna=False) == "string"
+        and not series.isna().any()
+    )
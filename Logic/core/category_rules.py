@@ -0,0 +1,116 @@
+import hashlib
+import json
+import operator
+import os
+
+import numpy as np
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+}
+
+# fields a rule condition can test
+FIELDS = ("hours_behind", "days_absent")
+
+# evaluated top to bottom, the first rule whose conditions all hold wins
+DEFAULT_RULES = [
+    {
+        "category": "significantly",
+        "when": [["hours_behind", ">=", 30], ["days_absent", ">", 30]],
+    },
+    {"category": "moderately", "when": [["hours_behind", ">=", 15]]},
+    {"category": "slightly", "when": [["hours_behind", ">", 10]]},
+]
+DEFAULT_CATEGORY = "on_track"
+
+
+class CategoryRules:
+    """
+    threshold rules mapping hours behind / days absent to a category
+
+    categorize() handles one record, categorize_columns() evaluates every
+    rule as a boolean mask over whole numpy columns. DataProcessor,
+    EmailManager and TemplateManager share one instance, so the thresholds
+    live in a single place. rules are listed from most to least severe
+    """
+
+    def __init__(self, rules=None, default=DEFAULT_CATEGORY):
+        self.rules = [self._validate_rule(rule) for rule in (rules or DEFAULT_RULES)]
+        self.default = default
+        # several rules may map to one category (an OR), so list each once
+        self.categories = list(dict.fromkeys(rule["category"] for rule in self.rules))
+        if default not in self.categories:
+            self.categories.append(default)
+
+        # higher is worse: the first rule is the most severe category
+        self.severity = {
+            category: len(self.categories) - position
+            for position, category in enumerate(self.categories)
+        }
+
+    @classmethod
+    def from_file(cls, path="category_rules.json"):
+        """
+        load {"rules": [...], "default": "on_track"} from a JSON file,
+        falling back to the built-in rules if it is missing or invalid
+        """
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    config = json.load(f)
+                return cls(config.get("rules"), config.get("default", DEFAULT_CATEGORY))
+            except Exception as e:
+                print(f"Error loading category rules: {e}")
+        return cls()
+
+    @property
+    def version(self):
+        # changes whenever the rules do, e.g. to invalidate cached results
+        config = json.dumps([self.rules, self.default], sort_keys=True)
+        return hashlib.sha1(config.encode("utf-8")).hexdigest()[:12]
+
+    def _validate_rule(self, rule):
+        if not isinstance(rule.get("category"), str):
+            raise ValueError(f"Rule has no category: {rule}")
+        for field, op, value in rule.get("when", []):
+            if field not in FIELDS:
+                raise ValueError(f"Unknown rule field: {field}")
+            if op not in OPERATORS:
+                raise ValueError(f"Unknown rule operator: {op}")
+            if not isinstance(value, (int, float)):
+                raise ValueError(f"Rule threshold must be a number: {value}")
+        return rule
+
+    def categorize(self, hours_behind, days_absent):
+        # category for a single record
+        values = {"hours_behind": hours_behind, "days_absent": days_absent}
+        for rule in self.rules:
+            if all(
+                OPERATORS[op](values[field], value) for field, op, value in rule["when"]
+            ):
+                return rule["category"]
+        return self.default
+
+    def categorize_columns(self, hours_behind, days_absent):
+        # category for every row, as an object array
+        values = {
+            "hours_behind": np.asarray(hours_behind),
+            "days_absent": np.asarray(days_absent),
+        }
+        count = len(values["hours_behind"])
+
+        masks = []
+        for rule in self.rules:
+            mask = np.ones(count, dtype=bool)
+            for field, op, value in rule["when"]:
+                mask &= OPERATORS[op](values[field], value)
+            masks.append(mask)
+
+        if not masks:
+            return np.full(count, self.default, dtype=object)
+        choices = [rule["category"] for rule in self.rules]
+        return np.select(masks, choices, self.default).astype(object)
@@ -1,83 +1,293 @@
+import json
 import pandas as pd
 import os
 import re
+import sys
+import threading
+from core.category_rules import CategoryRules
+from core.frame_cache import FrameCache
+from core.record_index import RecordIndex
+from core.record_view import RecordView
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as arrow_csv
+except ImportError:  # CSVs are read with pandas instead
+    arrow_csv = None
+
+try:
+    import python_calamine  # noqa: F401 (pd.read_excel engine="calamine")
+
+    XLSX_ENGINE = "calamine"
+except ImportError:  # XLSX files are read with pandas' default engine
+    XLSX_ENGINE = None
+
+
+# canonical field -> source column headers, in order of preference
+# headers are matched ignoring case, spaces and underscores
+COLUMN_ALIASES = {
+    "name": ["name", "apprentice_name", "apprentice", "full_name"],
+    "first_name": ["first_name", "forename"],
+    "email": ["email", "email_address"],
+    "manager_name": ["manager_name", "manager"],
+    "manager_email": ["manager_email", "manager_email_address"],
+    "off_the_job": ["off_the_job", "off_the_job_hours", "hours_behind"],
+    "last_attended": ["last_attended", "days_since_attended", "days_absent"],
+}
+
+# value used when a text field's column is missing or a cell is empty
+TEXT_DEFAULTS = {
+    "name": "there",
+    "email": "",
+    "manager_name": "your manager",
+    "manager_email": "",
+}
+
+NUMERIC_FIELDS = ("off_the_job", "last_attended")
+
+# bump whenever preprocess_data changes its output, to invalidate cached frames
+PREPROCESS_VERSION = 2
+
+# fields every upload is expected to have; missing ones are reported
+REQUIRED_FIELDS = ("name", "email", "off_the_job", "last_attended")
+
+# stages load_file reports through its progress_callback, in order
+LOAD_PHASES = ("parse", "clean", "categorise", "index")
+
+# CSV rows are parsed in blocks, reporting progress after each one. Arrow
+# infers column types from the first block, so it is kept large
+ARROW_BLOCK_SIZE = 16 << 20
+CSV_CHUNK_ROWS = 100000
+
+
+class LoadCancelled(Exception):
+    """raised inside load_file when its cancel_event is set"""
+
+
+def normalize_header(header):
+    # "Off the Job" / "off_the_job" / " OFF  THE JOB " -> "off_the_job"
+    return re.sub(r"[\s_]+", "_", str(header).strip().lower())
 
 
 class DataProcessor:
-    def __init__(self):
+    def __init__(
+        self,
+        aliases_file="column_aliases.json",
+        category_rules=None,
+        frame_cache=None,
+        ingest_engine="auto",
+    ):
         self.uploaded_file = None
+
+        # "auto" parses with pyarrow/calamine when installed, "pandas" never
+        self.ingest_engine = ingest_engine
+        # callable returning the placeholder names templates use; when set,
+        # source columns that neither preprocessing nor a template reads are
+        # not loaded. None loads every column
+        self.template_fields = None
+        self.category_rules = category_rules or CategoryRules.from_file()
         self.processed_data = []
         self.dataframe = None
         self.raw_dataframe = None  # store original data for reference
 
-    def preprocess_data(self, data):
+        # category -> positions of its records in processed_data
+        self.category_index = {}
+        # field indexes for search_records, built on first search
+        self.record_index = None
+        # row-level diff of the last incremental upload against the one before
+        self.upload_diff = None
 
-        # create a copy to avoid modifying the original data
-        processed_data = data.copy()
+        # parsed/preprocessed frames of previously opened files
+        self.frame_cache = frame_cache or FrameCache()
+        self._file_digest = None
+        # every column header of the loaded file, read when first needed
+        self._source_columns = None
 
-        # Rename columns to standardize naming
-        column_mapping = {
-            "off the job": "off_the_job",
-            "Off the job": "off_the_job",
-            "Off the Job": "off_the_job",
-            "Off The Job": "off_the_job",
-            "Last attended": "last_attended",
-            "Last Attended": "last_attended",
-            "last attended": "last_attended",
-            "Apprentice": "first_name",
+        # loads running on worker threads replace the data one at a time
+        self._load_lock = threading.Lock()
+
+        self.aliases_file = aliases_file
+        self.column_aliases = {
+            field: list(aliases) for field, aliases in COLUMN_ALIASES.items()
         }
+        self.schema_report = {"resolved": {}, "missing": []}
+        self.load_column_aliases()
+
+    def load_column_aliases(self):
+        """
+        extend the alias rules from a JSON file of
+        {"canonical_field": ["Header", ...]}
+        headers listed there are tried before the built-in ones
+        """
+        if not self.aliases_file or not os.path.exists(self.aliases_file):
+            return
+
+        try:
+            with open(self.aliases_file, "r") as f:
+                saved_aliases = json.load(f)
+            for field, aliases in saved_aliases.items():
+                if field in self.column_aliases and isinstance(aliases, list):
+                    self.column_aliases[field] = [
+                        str(alias) for alias in aliases
+                    ] + self.column_aliases[field]
+        except Exception as e:
+            print(f"Error loading column aliases: {e}")
 
-        processed_data.rename(columns=column_mapping, inplace=True)
+    def resolve_columns(self, columns):
+        """
+        map canonical fields to the source columns that provide them
+        returns (resolved {field: column}, missing [field, ...])
+        """
+        by_header = {}
+        for column in columns:
+            by_header.setdefault(normalize_header(column), column)
 
-        # ensure required columns exist
-        required_columns = ["off_the_job", "last_attended", "First Name"]
-        for col in required_columns:
-            if col not in processed_data.columns:
-                print(f"Warning: Column '{col}' not found. Creating empty column.")
-                processed_data[col] = 0
+        resolved = {}
+        used = set()
+        for field, aliases in self.column_aliases.items():
+            for alias in aliases:
+                column = by_header.get(normalize_header(alias))
+                if column is not None and column not in used:
+                    resolved[field] = column
+                    used.add(column)
+                    break
 
-        # remove non-digit characters and clean data
-        processed_data["off_the_job"] = (
-            processed_data["off_the_job"].astype(str).str.replace(r"\D", "", regex=True)
+        missing = [field for field in self.column_aliases if field not in resolved]
+        return resolved, missing
+
+    def preprocess_version(self):
+        # everything that changes what load_file produces
+        fields = self.template_fields() if self.template_fields else None
+        return json.dumps(
+            [
+                PREPROCESS_VERSION,
+                self.column_aliases,
+                self.category_rules.version,
+                None if fields is None else sorted(fields),
+            ],
+            sort_keys=True,
         )
-        processed_data["last_attended"] = (
-            processed_data["last_attended"]
-            .astype(str)
-            .str.replace(r"\D", "", regex=True)
+
+    def get_schema_report(self):
+        # which source columns fed each canonical field, and which were missing
+        return self.schema_report
+
+    def preprocess_data(self, data, report_missing=True, on_phase=None):
+        """
+        build the canonical record schema once, at ingest
+
+        aliases are resolved to fixed field names (name, first_name, email,
+        manager_name, manager_email, off_the_job, last_attended), numbers are
+        typed as ints and first names are extracted column-wise, so renderers
+        and categorisation only ever read fixed fields. on_phase, if given,
+        is called with "categorise" once cleaning is done
+        """
+        # create a copy to avoid modifying the original data
+        processed_data = data.copy()
+
+        # Rename source columns to the canonical field names
+        resolved, missing = self.resolve_columns(processed_data.columns)
+        processed_data.rename(
+            columns={column: field for field, column in resolved.items()},
+            inplace=True,
         )
+        self.schema_report = {"resolved": resolved, "missing": missing}
+
+        for field in REQUIRED_FIELDS:
+            if report_missing and field in missing:
+                print(f"Warning: Column '{field}' not found. Using default values.")
 
-        # convert to numeric, fill NaN, and convert to int
-        processed_data["off_the_job"] = (
-            pd.to_numeric(processed_data["off_the_job"], errors="coerce")
-            .fillna(0)
-            .astype(int)
+        # numeric fields: typed ints, 0 when missing or unreadable
+        for field in NUMERIC_FIELDS:
+            if field not in processed_data.columns:
+                processed_data[field] = 0
+            processed_data[field] = self._clean_numeric(processed_data[field])
+
+        # text fields: strings with empty cells filled in
+        for field, default in TEXT_DEFAULTS.items():
+            if field == "name" and field not in processed_data.columns:
+                if "first_name" in processed_data.columns:
+                    processed_data[field] = processed_data["first_name"]
+            processed_data[field] = self._clean_text(
+                processed_data.get(field), default, processed_data.index
+            )
+
+        # first name: its own column where given, else the first word of name
+        from_name = processed_data["name"].str.split(n=1).str[0]
+        first_name = self._clean_text(
+            processed_data.get("first_name"), "", processed_data.index
         )
-        processed_data["last_attended"] = (
-            pd.to_numeric(processed_data["last_attended"], errors="coerce")
-            .fillna(0)
-            .astype(int)
+        processed_data["first_name"] = (
+            first_name.where(first_name != "", from_name)
+            .fillna("there")
+            .replace("", "there")
         )
+        for field in (*TEXT_DEFAULTS, "first_name"):
+            processed_data[field] = self._compact_text(processed_data[field])
 
-        # apply categorization
-        processed_data["off_track_category"] = processed_data.apply(
-            lambda row: self.categorize_off_the_job(
-                row["off_the_job"], row["last_attended"]
-            ),
-            axis=1,
+        # apply categorization to the whole columns at once
+        if on_phase:
+            on_phase("categorise")
+        processed_data["off_track_category"] = self._category_column(
+            self.category_rules.categorize_columns(
+                processed_data["off_the_job"].to_numpy(),
+                processed_data["last_attended"].to_numpy(),
+            )
         )
 
-        processed_data["hours_behind"] = processed_data[
-            "off_the_job"
-        ]  # alias for template compatibility
-        processed_data["days_absent"] = processed_data[
-            "last_attended"
-        ]  # alias for template compatibility
-
-        if "email" not in processed_data.columns:
-            processed_data["email"] = ""
+        # hours_behind/days_absent are not stored; RecordView adds them to
+        # each record from off_the_job/last_attended
 
         return processed_data
 
+    def _clean_numeric(self, column):
+        # numeric columns are used as-is; text like "12 hrs" keeps only its digits
+        if not pd.api.types.is_numeric_dtype(column):
+            column = column.astype(str).str.replace(r"\D", "", regex=True)
+        column = pd.to_numeric(column, errors="coerce").fillna(0).astype(int)
+        # the narrowest integer type that holds every value
+        return pd.to_numeric(column, downcast="integer")
+
+    def _compact_text(self, column):
+        # repeated values (managers, first names) are stored once, as categories
+        if len(column) and column.nunique(dropna=False) <= len(column) // 2:
+            return column.astype("category")
+        return column.astype(str)
+
+    def _uncategorized(self, column):
+        # plain values, so new ones can be mixed into a categorical column
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            return column.astype(object)
+        return column
+
+    def _write_rows(self, column, rows, values):
+        # set only the given rows, keeping the column's dtype when they fit
+        column = self._uncategorized(column).copy()
+        try:
+            column.loc[rows] = values
+        except (TypeError, ValueError):
+            column = column.astype(object)
+            column.loc[rows] = values
+        return column
+
+    def _category_column(self, values):
+        # categorical over the rule categories, plus any other values present
+        values = pd.Series(values)
+        categories = list(self.category_rules.categories)
+        categories += [
+            value
+            for value in values.dropna().unique().tolist()
+            if value not in categories
+        ]
+        return pd.Categorical(values, categories=categories)
+
+    def _clean_text(self, column, default, index):
+        # stripped strings, with missing or blank cells set to default
+        if column is None:
+            return pd.Series(default, index=index, dtype=object)
+        text = column.astype(str).str.strip().where(column.notna(), "")
+        return text.mask(text == "", default) if default else text
+
     def categorize_off_the_job(self, hrs, dys):
         try:
             hrs = int(hrs) if hrs else 0
@@ -86,43 +296,309 @@ class DataProcessor:
             hrs = 0
             dys = 0
 
-        if hrs >= 30 and dys > 30:
-            return "significantly"
-        elif hrs >= 15:
-            return "moderately"
-        elif hrs > 10:
-            return "slightly"
-        else:
-            return "on_track"
+        return self.category_rules.categorize(hrs, dys)
+
+    def load_file(
+        self, file_path, incremental=False, progress_callback=None, cancel_event=None
+    ):
+        """
+        load and preprocess a CSV/XLSX file
+
+        with incremental=True and data already loaded, the new file is
+        compared with it row by row, keyed by email, and the result is kept
+        in upload_diff (see _diff_upload)
 
-    def load_file(self, file_path):
+        safe to run on a worker thread: progress_callback(phase, rows) is
+        called from it as each LOAD_PHASES phase starts and as CSV rows are
+        parsed, and setting cancel_event (a threading.Event) stops the load
+        at the next of those points. the loaded data is only replaced once
+        the new file is fully preprocessed, so a cancelled or failed load
+        keeps the previous one
+        """
+
+        def step(phase, rows=0):
+            if cancel_event is not None and cancel_event.is_set():
+                raise LoadCancelled()
+            if progress_callback:
+                progress_callback(phase, rows)
+
+        schema_report = self.schema_report
         try:
-            # load the file
-            if file_path.endswith(".csv"):
-                df = pd.read_csv(file_path)
-            elif file_path.endswith(".xlsx"):
-                df = pd.read_excel(file_path)
-            else:
+            if not file_path.endswith((".csv", ".xlsx")):
                 raise ValueError("Unsupported file format")
 
-            # store raw data
-            self.raw_dataframe = df.copy()
+            # re-opening a file that is already cached skips parsing entirely
+            step("parse")
+            file_digest = None
+            cached = None
+            if self.frame_cache.enabled:
+                file_digest = self.frame_cache.file_digest(file_path)
+                cached = self.frame_cache.get(self._cache_key(file_digest))
+
+            if cached is not None:
+                raw_dataframe, dataframe = cached
+                resolved, missing = self.resolve_columns(raw_dataframe.columns)
+                self.schema_report = {"resolved": resolved, "missing": missing}
+            else:
+                # load the file
+                raw_dataframe = self._read_file(
+                    file_path, on_rows=lambda rows: step("parse", rows)
+                )
 
-            # preprocess the data
-            self.dataframe = self.preprocess_data(df)
+                # preprocess the data (preprocess_data works on its own copy)
+                step("clean", len(raw_dataframe))
+                dataframe = self.preprocess_data(
+                    raw_dataframe,
+                    on_phase=lambda phase: step(phase, len(raw_dataframe)),
+                )
+                self._cache_frames(file_digest, raw_dataframe, dataframe)
 
-            # update processed_data list
-            self.processed_data = self.dataframe.to_dict("records")
-            self.uploaded_file = file_path
+            with self._load_lock:
+                step("index", len(dataframe))
 
-            return (
-                True,
-                f"File loaded and processed successfully! {len(self.dataframe)} records found.",
-            )
+                previous = None
+                if incremental and self.dataframe is not None:
+                    previous, previous_data = self.dataframe, self.processed_data
+
+                self.raw_dataframe = raw_dataframe
+                self.dataframe = dataframe
+                self._file_digest = file_digest
+                self._source_columns = None
+
+                # records are built from the DataFrame only when accessed
+                self.processed_data = RecordView(self.dataframe)
+                self._build_indexes()
+                self.uploaded_file = file_path
+
+                self.upload_diff = None
+                if previous is not None:
+                    self.upload_diff = self._diff_upload(previous, previous_data)
 
+            message = f"File loaded and processed successfully! {len(self.dataframe)} records found."
+            missing = [
+                field
+                for field in REQUIRED_FIELDS
+                if field in self.schema_report["missing"]
+            ]
+            if missing:
+                message += f"\nMissing columns (defaults used): {', '.join(missing)}"
+            if self.upload_diff is not None:
+                counts = self.get_diff_counts()
+                message += (
+                    f"\nSince the previous upload: {counts['new']} new,"
+                    f" {counts['removed']} removed,"
+                    f" {counts['category_changed']} changed category"
+                    f" ({counts['worsened']} worse),"
+                    f" {counts['unchanged']} unchanged"
+                )
+
+            return True, message
+
+        except LoadCancelled:
+            self.schema_report = schema_report
+            return False, "Loading cancelled"
         except Exception as e:
+            self.schema_report = schema_report
             return False, f"Failed to load file: {str(e)}"
 
+    def _read_file(self, file_path, on_rows=None, columns=None):
+        """
+        parse a CSV/XLSX file, keeping only the given columns, or by default
+        the ones _column_filter() accepts. uses pyarrow's CSV reader or the calamine XLSX reader when
+        installed (and ingest_engine is "auto"), otherwise or if they fail,
+        pandas' default readers. CSVs are read in blocks, calling
+        on_rows(rows parsed so far) after each; XLSX files are read whole
+        """
+        if columns is not None:
+            keep = lambda column: column in columns
+        else:
+            keep = self._column_filter()
+        fast = self.ingest_engine == "auto"
+
+        if file_path.endswith(".csv"):
+            if fast and arrow_csv is not None:
+                try:
+                    return self._read_csv_arrow(file_path, keep, on_rows)
+                except LoadCancelled:
+                    raise
+                except Exception as e:
+                    print(f"Fast CSV reader failed, using pandas: {e}")
+            return self._read_csv_pandas(file_path, keep, on_rows)
+
+        if fast and XLSX_ENGINE is not None:
+            try:
+                return pd.read_excel(file_path, usecols=keep, engine=XLSX_ENGINE)
+            except Exception as e:
+                print(f"Fast XLSX reader failed, using pandas: {e}")
+        return pd.read_excel(file_path, usecols=keep)
+
+    def _read_csv_pandas(self, file_path, keep, on_rows):
+        chunks = []
+        rows = 0
+        for chunk in pd.read_csv(file_path, usecols=keep, chunksize=CSV_CHUNK_ROWS):
+            chunks.append(chunk)
+            rows += len(chunk)
+            if on_rows:
+                on_rows(rows)
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks, ignore_index=True)
+
+    def _read_csv_arrow(self, file_path, keep, on_rows):
+        # multi-threaded Arrow parse, typed like pd.read_csv
+        columns = pd.read_csv(file_path, nrows=0).columns
+        if keep is not None:
+            columns = [column for column in columns if keep(column)]
+            if not columns:
+                # Arrow reads every column when include_columns is empty
+                return self._read_csv_pandas(file_path, keep, on_rows)
+
+        reader = arrow_csv.open_csv(
+            file_path,
+            read_options=arrow_csv.ReadOptions(block_size=ARROW_BLOCK_SIZE),
+            convert_options=arrow_csv.ConvertOptions(
+                include_columns=list(columns),
+                strings_can_be_null=True,
+                timestamp_parsers=[],  # pandas leaves dates as text too
+            ),
+        )
+        batches = []
+        rows = 0
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            if on_rows:
+                on_rows(rows)
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+
+        for index, field in enumerate(table.schema):
+            # ISO dates are still inferred; keep their text like pandas does
+            if pa.types.is_temporal(field.type):
+                column = table.column(index).cast(pa.string())
+                table = table.set_column(index, field.name, column)
+
+        frame = table.to_pandas()
+        # Arrow marks missing values in object columns (e.g. booleans with
+        # gaps) as None where pandas uses NaN
+        for column in frame.columns[frame.dtypes == object]:
+            frame[column] = frame[column].where(frame[column].notna(), float("nan"))
+        return frame
+
+    def _column_filter(self):
+        # predicate for the source columns to load, or None to load them all
+        if not self.template_fields:
+            return None
+
+        fields = set(self.template_fields())
+        headers = {
+            normalize_header(alias)
+            for aliases in self.column_aliases.values()
+            for alias in aliases
+        }
+        return lambda column: column in fields or normalize_header(column) in headers
+
+    def add_template_columns(self):
+        """
+        read source columns that templates started using after the file was
+        loaded. a pruned load (template_fields set) only reads the columns in
+        use at the time, so a placeholder added later would find no data.
+        the columns are added to the loaded frames in place
+        """
+        if not self.template_fields or self.raw_dataframe is None:
+            return True, ""
+
+        try:
+            if self._source_columns is None:
+                self._source_columns = self._read_header(self.uploaded_file)
+            fields = set(self.template_fields())
+            columns = [
+                column
+                for column in self._source_columns
+                if column in fields
+                and column not in self.raw_dataframe
+                and column not in self.dataframe
+            ]
+            if not columns:
+                return True, ""
+
+            # the new columns are aligned with the loaded rows by position
+            extra = self._read_file(self.uploaded_file, columns=columns)
+            changed = len(extra) != len(self.raw_dataframe)
+            if self._file_digest is not None:
+                digest = self.frame_cache.file_digest(self.uploaded_file)
+                changed = changed or digest != self._file_digest
+            if changed:
+                raise ValueError("the file changed since it was loaded")
+
+            with self._load_lock:
+                values = {column: extra[column].to_numpy() for column in columns}
+                self.raw_dataframe = self.raw_dataframe.assign(**values)
+                # the same frame backs processed_data, so records see them too
+                for column, column_values in values.items():
+                    self.dataframe[column] = column_values
+                self._cache_frames(
+                    self._file_digest, self.raw_dataframe, self.dataframe
+                )
+
+            return True, f"Loaded columns: {', '.join(columns)}"
+
+        except Exception as e:
+            return False, f"Failed to load template columns: {str(e)}"
+
+    def _read_header(self, file_path):
+        # column names only
+        if file_path.endswith(".csv"):
+            return list(pd.read_csv(file_path, nrows=0).columns)
+        engine = XLSX_ENGINE if self.ingest_engine == "auto" else None
+        return list(pd.read_excel(file_path, nrows=0, engine=engine).columns)
+
+    def iter_chunks(self, file_path, chunk_size=50000):
+        """
+        stream a file as preprocessed DataFrame chunks of up to chunk_size rows
+
+        only one chunk is held in memory at a time, and nothing is kept on
+        the processor, so a multi-million-row export can be fed straight
+        into EmailManager.send_stream without loading it first
+        """
+        if file_path.endswith(".csv"):
+            reader = pd.read_csv(file_path, chunksize=chunk_size)
+        elif file_path.endswith(".xlsx"):
+            reader = self._iter_xlsx_chunks(file_path, chunk_size)
+        else:
+            raise ValueError("Unsupported file format")
+
+        for number, chunk in enumerate(reader):
+            # missing columns are reported for the first chunk only
+            yield self.preprocess_data(chunk, report_missing=number == 0)
+
+    def _iter_xlsx_chunks(self, file_path, chunk_size):
+        # read-only openpyxl streams rows instead of loading the whole sheet
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [
+                f"Unnamed: {i}" if name is None else str(name)
+                for i, name in enumerate(header)
+            ]
+
+            chunk = []
+            for row in rows:
+                if all(value is None for value in row):
+                    continue
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    yield pd.DataFrame(chunk, columns=columns)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=columns)
+        finally:
+            workbook.close()
+
     def get_data_preview(self, max_rows=20):
         if self.dataframe is not None:
             return self.dataframe.head(max_rows)
@@ -203,7 +679,7 @@ class DataProcessor:
         return len(self.processed_data)
 
     def get_processed_data(self):
-        # get the processed data as list of dictionaries
+        # get the processed data as a (lazy) list of dictionaries
         return self.processed_data
 
     def get_dataframe(self):
@@ -214,15 +690,94 @@ class DataProcessor:
     #     """Get the original unprocessed data as pandas DataFrame"""
     #     return self.raw_dataframe
 
+    def memory_report(self):
+        """
+        bytes held by the loaded data: per column of the processed DataFrame,
+        and per structure (DataFrames, record view, indexes, upload diff).
+        frames that share column buffers are each counted in full
+        """
+        columns = {}
+        if self.dataframe is not None:
+            usage = self.dataframe.memory_usage(deep=True)
+            columns = {column: int(size) for column, size in usage.items()}
+
+        structures = {
+            "dataframe": sum(columns.values()),
+            "raw_dataframe": (
+                0
+                if self.raw_dataframe is None
+                else int(self.raw_dataframe.memory_usage(deep=True).sum())
+            ),
+            "processed_data": sys.getsizeof(self.processed_data),
+            "category_index": sum(
+                sys.getsizeof(category) + positions.nbytes
+                for category, positions in self.category_index.items()
+            ),
+            "record_index": (
+                0 if self.record_index is None else self.record_index.memory_usage()
+            ),
+            "upload_diff": sum(
+                sys.getsizeof(group) for group in (self.upload_diff or {}).values()
+            ),
+        }
+        return {
+            "columns": columns,
+            "structures": structures,
+            "total": sum(structures.values()),
+        }
+
     def get_category_data(self, category):
+        # records of one category, looked up through the category index
         if not self.has_data():
             return []
+        return self.processed_data.take(self.get_category_positions(category))
 
-        return [
-            record
-            for record in self.processed_data
-            if record.get("off_track_category") == category
-        ]
+    def get_snapshot(self, category=None):
+        """
+        records of one category (all records when None) and the matching
+        DataFrame rows, read together so a load finishing on another thread
+        cannot swap the data in between
+        """
+        with self._load_lock:
+            if not self.has_data():
+                return [], None
+            if category is None:
+                return self.processed_data, self.dataframe
+            positions = self.get_category_positions(category)
+            frame = self.dataframe.iloc[positions]
+            return self.processed_data.take(positions), frame
+
+    def get_category_positions(self, category):
+        # row positions of a category, in file order
+        return self.category_index.get(category, [])
+
+    def get_category_count(self, category):
+        return len(self.get_category_positions(category))
+
+    def get_category_counts(self):
+        # records per category, for every category the rules define
+        counts = dict.fromkeys(self.category_rules.categories, 0)
+        counts.update(
+            (category, len(positions))
+            for category, positions in self.category_index.items()
+        )
+        return counts
+
+    def _build_indexes(self):
+        # redone whenever the data may have changed
+        self.record_index = None
+        self._build_category_index()
+
+    def _build_category_index(self):
+        # one pass over the category column
+        if self.dataframe is None or "off_track_category" not in self.dataframe:
+            self.category_index = {}
+            return
+
+        # numpy arrays of positions, for categories that have any rows
+        self.category_index = self.dataframe.groupby(
+            "off_track_category", sort=False, observed=True
+        ).indices
 
     # def export_processed_data(self, file_path):
     #     try:
@@ -254,51 +809,218 @@ class DataProcessor:
             return False, "No raw data available to reprocess"
 
         try:
-            self.dataframe = self.preprocess_data(self.raw_dataframe)
-            self.processed_data = self.dataframe.to_dict("records")
+            cached = None
+            if self._file_digest is not None:
+                cached = self.frame_cache.get(self._cache_key(self._file_digest))
+
+            if cached is not None:
+                self.dataframe = cached[1]
+            else:
+                self.dataframe = self.preprocess_data(self.raw_dataframe)
+                self._cache_frames(
+                    self._file_digest, self.raw_dataframe, self.dataframe
+                )
+            self.processed_data = RecordView(self.dataframe)
+            self._build_indexes()
             return True, "Data reprocessed successfully"
 
         except Exception as e:
             return False, f"Failed to reprocess data: {str(e)}"
 
+    def _diff_upload(self, previous, previous_data):
+        """
+        classify the loaded rows against the previous snapshot by email:
+        new, unchanged or category_changed (worsened is the subset that
+        moved to a more severe category) as positions in processed_data,
+        and removed as the previous records no longer present. rows without
+        an email cannot be matched: new ones count as new and previous ones
+        as removed
+        """
+        keys = self._email_keys(self.dataframe["email"]).to_numpy(dtype=object)
+        previous_keys = self._email_keys(previous["email"]).to_numpy(dtype=object)
+
+        # previous category per normalised email, aligned to the new rows
+        categories = pd.Series(
+            previous["off_track_category"].to_numpy(dtype=object),
+            index=previous_keys,
+        )
+        categories = categories[
+            (previous_keys != "") & ~categories.index.duplicated(keep="last")
+        ]
+        before = categories.reindex(keys).to_numpy()
+        now = self.dataframe["off_track_category"].to_numpy(dtype=object)
+
+        severity = self.category_rules.severity
+        is_new = pd.isna(before)
+        changed = ~is_new & (before != now)
+        worse = (
+            pd.Series(now).map(severity).to_numpy()
+            > pd.Series(before).map(severity).to_numpy()
+        )
+
+        present = pd.Index(keys).unique()
+        removed = (
+            (present.get_indexer(previous_keys) < 0) | (previous_keys == "")
+        ).nonzero()[0]
+
+        return {
+            "new": is_new.nonzero()[0].tolist(),
+            "unchanged": (~is_new & ~changed).nonzero()[0].tolist(),
+            "category_changed": changed.nonzero()[0].tolist(),
+            "worsened": (changed & worse).nonzero()[0].tolist(),
+            "removed": previous_data.take(removed),
+        }
+
+    def get_diff_counts(self):
+        # size of each upload_diff group, all zero without a diff
+        kinds = ("new", "removed", "unchanged", "category_changed", "worsened")
+        diff = self.upload_diff or {}
+        return {kind: len(diff.get(kind, ())) for kind in kinds}
+
+    def get_diff_data(self, kind):
+        # records of one upload_diff group, e.g. "worsened"
+        if not self.upload_diff:
+            return []
+        if kind == "removed":
+            return self.upload_diff["removed"]
+        return self.processed_data.take(self.upload_diff.get(kind, []))
+
+    def _enrichment_frame(self, additional_data):
+        # side table of canonical fields, indexed by normalised email
+        if isinstance(additional_data, dict):
+            side = pd.DataFrame.from_dict(additional_data, orient="index")
+            keys = pd.Series(side.index, index=side.index)
+        else:
+            if additional_data.endswith(".csv"):
+                side = pd.read_csv(additional_data)
+            elif additional_data.endswith(".xlsx"):
+                side = pd.read_excel(additional_data)
+            else:
+                raise ValueError("Unsupported file format")
+            keys = None
+
+        resolved, _ = self.resolve_columns(side.columns)
+        side = side.rename(
+            columns={column: field for field, column in resolved.items()}
+        )
+        if keys is None:
+            if "email" not in side.columns:
+                raise ValueError("Enrichment file has no email column")
+            keys = side["email"]
+
+        # the email is the join key, not a field to overwrite
+        side = side.drop(columns=["email"], errors="ignore")
+        side.index = self._email_keys(keys)
+
+        # later rows win, like repeated dict updates would
+        side = side[side.index != ""]
+        return side[~side.index.duplicated(keep="last")]
+
+    def _email_keys(self, emails):
+        return emails.astype(str).str.strip().str.lower().where(emails.notna(), "")
+
+    def _cache_key(self, file_digest):
+        return self.frame_cache.key(file_digest, self.preprocess_version())
+
+    def _cache_frames(self, file_digest, raw_dataframe, dataframe):
+        # store the frames for the next time this file is opened
+        if file_digest is not None:
+            self.frame_cache.put(self._cache_key(file_digest), raw_dataframe, dataframe)
+
     # TODO: data Retrieval - Enhanced with preprocessing
     def search_records(self, **kwargs):
-        # search records based on criteria
+        """
+        search records based on criteria: numeric fields (off_the_job,
+        last_attended) match values >= the given one, anything else is a
+        case-insensitive substring match. answered from RecordIndex
+        """
         if not self.has_data():
             return []
 
-        results = self.processed_data.copy()
-
-        for key, value in kwargs.items():
-            if key in ["off_the_job", "last_attended"]:
-                # numeric search
-                results = [r for r in results if r.get(key, 0) >= value]
-            else:
-                # string search (case insensitive)
-                results = [
-                    r
-                    for r in results
-                    if str(value).lower() in str(r.get(key, "")).lower()
-                ]
+        if self.record_index is None:
+            self.record_index = RecordIndex(self.dataframe)
 
-        return results
+        return self.processed_data.take(self.record_index.search(**kwargs))
 
     # TODO: email Data Enrichment - Enhanced with category-based enrichment
-    def enrich_email_data(self, additional_data_dict):
-        # enrich existing records with additional data
+    def enrich_email_data(self, additional_data):
+        """
+        join extra fields onto the loaded records by email
+
+        additional_data is {email: {field: value}} or a CSV/XLSX file with an
+        email column, such as a manager contact list. emails are matched on a
+        stripped, lowercased key with a single hash join; empty cells leave
+        the existing value alone. only the derived columns that depend on an
+        enriched field are recomputed; records read from the updated frame
+        """
         if not self.has_data():
             return False, "No data to enrich"
 
         try:
-            for record in self.processed_data:
-                email = record.get("email", "")
-                if email in additional_data_dict:
-                    record.update(additional_data_dict[email])
+            side = self._enrichment_frame(additional_data)
+
+            # align the side table to our rows by the normalised email
+            dataframe = self.dataframe
+            keys = self._email_keys(dataframe["email"])
+            positions = side.index.get_indexer(keys)
+            rows = side.reindex(keys)
+            rows.index = dataframe.index
+            matched = rows.notna().any(axis=1)
+
+            updated = {}  # field -> rows whose value was provided
+            for field in rows.columns:
+                provided = rows[field].notna()
+                # the side table's own values, so they keep its dtype
+                values = side[field].iloc[positions[provided.to_numpy()]].to_numpy()
+                if field in dataframe.columns:
+                    column = dataframe[field]
+                else:
+                    # rows without a value render blank, not "nan"
+                    column = pd.Series("", index=dataframe.index, dtype=object)
+                dataframe[field] = self._write_rows(column, provided, values)
+                updated[field] = provided
+
+            # recompute what depends on the enriched fields
+            for field in NUMERIC_FIELDS:
+                if field in updated:
+                    dataframe[field] = self._clean_numeric(dataframe[field])
+            for field, default in TEXT_DEFAULTS.items():
+                if field in updated:
+                    dataframe[field] = self._clean_text(
+                        dataframe[field], default, dataframe.index
+                    )
+            if "name" in updated and "first_name" not in updated:
+                from_name = dataframe["name"].str.split(n=1).str[0].fillna("there")
+                dataframe["first_name"] = from_name.where(
+                    updated["name"], self._uncategorized(dataframe["first_name"])
+                )
+                updated["first_name"] = updated["name"]
+            for field in (*TEXT_DEFAULTS, "first_name"):
+                if field in updated:
+                    dataframe[field] = self._compact_text(dataframe[field])
+            if any(field in updated for field in NUMERIC_FIELDS):
+                categories = pd.Series(
+                    self.category_rules.categorize_columns(
+                        dataframe["off_the_job"].to_numpy(),
+                        dataframe["last_attended"].to_numpy(),
+                    ),
+                    index=dataframe.index,
+                )
+                # a category given in the enrichment data wins
+                if "off_track_category" in updated:
+                    categories = self._uncategorized(
+                        dataframe["off_track_category"]
+                    ).where(updated["off_track_category"], categories)
+                dataframe["off_track_category"] = self._category_column(categories)
+            elif "off_track_category" in updated:
+                dataframe["off_track_category"] = self._category_column(
+                    dataframe["off_track_category"]
+                )
 
-            # update dataframe
-            self.dataframe = pd.DataFrame(self.processed_data)
+            # categories may have changed
+            self._build_indexes()
 
-            return True, f"Data enriched for {len(additional_data_dict)} records"
+            return True, f"Data enriched for {int(matched.sum())} records"
 
         except Exception as e:
             return False, f"Failed to enrich data: {str(e)}"
@@ -1,133 +1,597 @@
+import asyncio
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import queue
 import threading
 import time
 from datetime import datetime
+from core.async_smtp import AsyncSMTPConnection
+from core.category_rules import CategoryRules
+from core.message_renderer import MessageRenderer
+from core.template_compiler import compile_template
+from core.outbox import Outbox, QUEUED, SENDING, SENT, FAILED
+from core.rate_limiter import RateLimiter, THROTTLE_CODES
+from core.record_view import RecordView
+from core.render_context import (
+    DERIVED_PLACEHOLDERS,
+    NUMERIC_PLACEHOLDERS,
+    RenderContext,
+)
+from core.transports import create_transport
+from core.retry_scheduler import (
+    FAILURE_CLASS_LABELS,
+    TRANSIENT,
+    RetryScheduler,
+    classify_failure,
+    reply_code,
+)
+
+
+def _is_connection_error(error):
+    # dropped sessions and socket errors, as opposed to SMTP replies
+    # (smtplib exceptions subclass OSError, so they are excluded explicitly)
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
 
 
 class EmailManager:
-    def __init__(self):
-        self.email_status = {"sent": 0, "failed": 0, "total": 0}
+    def __init__(self, category_rules=None):
+        self.category_rules = category_rules or CategoryRules.from_file()
+        self.email_status = {
+            "sent": 0,
+            "failed": 0,
+            "total": 0,
+            "reconnects": 0,
+            "retries": 0,
+        }
         self.is_sending = False
         self.failed_emails = []
         self.sending_log = []
         self.smtp_config = {}
+        self._status_lock = threading.Lock()
+        self._completed = 0
+        self._rate_limiter = None
+        self._retry_scheduler = None
+        self._renderer = None
+        self._prerendered = None
+        self._render_context = None
+        self._input_done = True
+        self._render_stop = None
+        self.outbox = None
+        self.campaign_id = None
 
     def configure(self, config):
         """Configure SMTP settings"""
         self.smtp_config = config
 
+        # durable send state, when an outbox database is configured
+        outbox_path = config.get("outbox_path")
+        if self.outbox is not None and self.outbox.path != outbox_path:
+            self.outbox.close()
+            self.outbox = None
+        if outbox_path and self.outbox is None:
+            self.outbox = Outbox(outbox_path)
+
     def reset_status(self):
         # reset email sending status"""
-        self.email_status = {"sent": 0, "failed": 0, "total": 0}
+        self.email_status = {
+            "sent": 0,
+            "failed": 0,
+            "total": 0,
+            "reconnects": 0,
+            "retries": 0,
+        }
         self.failed_emails = []
         self.sending_log = []
 
-    def send_bulk_emails(self, data, templates, progress_callback=None):
+    def send_bulk_emails(
+        self, data, templates, progress_callback=None, rendered=None, context=None
+    ):
         """
         send bulk emails with progress callback
         this method is used by the UI for synchronous sending
+
+        records are shared through a queue between a pool of authenticated
+        SMTP sessions ("pool_size" in the SMTP config, default 1), each
+        drained by its own worker thread
+
+        rendered is an optional batch_renderer.render_dataframe() result with
+        one row per record, in the same order as data. context is the
+        RenderContext it was rendered with, so records rendered while sending
+        (retries, rows the batch skipped) get the same dates
+        """
+        try:
+            self._begin_run(len(data), rendered, context=context)
+            if self.outbox is not None:
+                self.campaign_id = self.outbox.create_campaign(data)
+            # records are built lazily by the render thread, not up front
+            self._run_pool(enumerate(data), templates, progress_callback, len(data))
+
+        except Exception as e:
+            print(f"SMTP Error: {e}")
+        finally:
+            self._end_run()
+
+    def send_stream(self, chunks, templates, progress_callback=None):
+        """
+        send records as they are read, without holding the whole cohort
+
+        chunks is an iterable of record chunks, either lists of dicts or
+        preprocessed DataFrames (e.g. DataProcessor.iter_chunks()). chunks
+        are pulled lazily by the renderer, so memory stays bounded by the
+        render buffer plus one chunk and the first emails go out while the
+        rest of the file is still being read. the total shown in progress
+        grows as chunks arrive
         """
         try:
-            self.is_sending = True
-            self.reset_status()
-            self.email_status["total"] = len(data)
+            self._begin_run(0)
+            self._input_done = False
+            if self.outbox is not None:
+                self.campaign_id = self.outbox.create_campaign([])
+            self._run_pool(self._stream_items(chunks), templates, progress_callback)
+
+        except Exception as e:
+            print(f"SMTP Error: {e}")
+        finally:
+            self._input_done = True
+            self._end_run()
 
-            # connect to SMTP server
-            server = smtplib.SMTP(
-                self.smtp_config["smtp_server"], self.smtp_config["smtp_port"]
+    def _stream_items(self, chunks):
+        # (position, record) pairs over all chunks, counting them into the run
+        position = 0
+        try:
+            for chunk in chunks:
+                if hasattr(chunk, "to_dict"):
+                    chunk = list(RecordView(chunk))
+                if self.outbox is not None:
+                    self.outbox.add_records(self.campaign_id, chunk, position)
+                with self._status_lock:
+                    self.email_status["total"] += len(chunk)
+
+                for record in chunk:
+                    yield position, record
+                    position += 1
+        except Exception as e:
+            print(f"Error reading records: {e}")
+        finally:
+            with self._status_lock:
+                self._input_done = True
+
+    def resume_campaign(
+        self, campaign_id, templates, progress_callback=None, include_failed=False
+    ):
+        """
+        resume an interrupted campaign from the outbox
+        only messages still queued or sending (and failed ones, if asked)
+        are sent again
+        """
+        if self.outbox is None:
+            return False, "No outbox configured"
+
+        items = []
+        try:
+            items = self.outbox.unfinished(campaign_id, include_failed)
+            # keep the dates the campaign's first emails were sent with
+            self._begin_run(
+                len(items), started_at=self.outbox.campaign_started_at(campaign_id)
             )
-            server.starttls()
-            server.login(
-                self.smtp_config["sender_email"], self.smtp_config["sender_password"]
+            self.campaign_id = campaign_id
+            self._run_pool(items, templates, progress_callback)
+
+        except Exception as e:
+            print(f"SMTP Error: {e}")
+        finally:
+            self._end_run()
+
+        return True, f"Resumed campaign {campaign_id}: {len(items)} messages"
+
+    def get_unfinished_campaigns(self, include_failed=False):
+        # campaigns in the outbox that still have messages to send
+        if self.outbox is None:
+            return []
+        return self.outbox.unfinished_campaigns(include_failed)
+
+    def dismiss_campaign(self, campaign_id):
+        # drop a campaign from the outbox so it is no longer offered for resume
+        if self.outbox is not None:
+            self.outbox.dismiss_campaign(campaign_id)
+
+    def _begin_run(self, total, rendered=None, started_at=None, context=None):
+        self.is_sending = True
+        self.reset_status()
+        self.email_status["total"] = total
+        self._completed = 0
+        self._input_done = True  # cleared while a stream is still being read
+        self._rate_limiter = self._create_rate_limiter(self.smtp_config)
+        self._retry_scheduler = RetryScheduler(
+            max_attempts=self.smtp_config.get("max_attempts", 4),
+            base_delay=self.smtp_config.get("retry_base_delay", 2.0),
+        )
+        self._renderer = None
+        self._render_stop = None
+        self._render_context = context or RenderContext(started_at)
+        self.campaign_id = None
+
+        # pre-rendered (template_type, subject, body) per position, if any
+        self._prerendered = None
+        if rendered is not None:
+            if len(rendered) != total:
+                raise ValueError("Rendered rows do not match the records to send")
+            self._prerendered = list(
+                zip(rendered["template"], rendered["subject"], rendered["body"])
             )
 
-            for i, record in enumerate(data):
-                try:
-                    # determine template type using the template manager approach
-                    template_type = self._determine_template_type(record)
-                    template = templates.get(
-                        template_type, templates.get("on_track", {})
-                    )
-
-                    if not template:
-                        raise Exception(f"No template found for type: {template_type}")
-
-                    # create email
-                    msg = MIMEMultipart()
-                    msg["From"] = self.smtp_config["sender_email"]
-                    msg["To"] = record.get("email", "")
-
-                    # replace placeholders in subject and body
-                    subject = self._replace_placeholders(
-                        template.get("subject", ""), record
-                    )
-                    body = self._replace_placeholders(template.get("body", ""), record)
-
-                    msg["Subject"] = subject
-                    msg.attach(MIMEText(body, "plain"))
-
-                    # send email
-                    server.sendmail(
-                        self.smtp_config["sender_email"],
-                        record.get("email", ""),
-                        msg.as_string(),
-                    )
-
-                    self.email_status["sent"] += 1
-                    self.sending_log.append(
-                        {
-                            "email": record.get("email", ""),
-                            "name": record.get("name", "Unknown"),
-                            "status": "sent",
-                            "template": template_type,
-                            "timestamp": datetime.now(),
-                        }
-                    )
+    def _end_run(self):
+        # add any remaining emails as failed if no session could drain them
+        remaining_count = (
+            self.email_status["total"]
+            - self.email_status["sent"]
+            - self.email_status["failed"]
+        )
+        self.email_status["failed"] += remaining_count
+        if self.outbox is not None:
+            # campaigns with unsent or failed messages are kept for resume
+            self.outbox.prune_finished()
+        if self._render_stop is not None:
+            self._render_stop.set()
+        self.is_sending = False
+
+    def _start_render(self, items, templates):
+        """
+        render (position, record) items into wire-ready bytes on a background
+        thread, running ahead of the senders into a bounded buffer
+        """
+        self._renderer = MessageRenderer(
+            self.smtp_config["sender_email"],
+            templates,
+            self._determine_template_type,
+            self._replace_placeholders,
+        )
+        buffer, self._render_stop = self._renderer.start(
+            items, self.smtp_config.get("render_buffer", 256), self._prerendered
+        )
+        return buffer
+
+    def _run_pool(self, items, templates, progress_callback, count=None):
+        # items are (position, record) pairs; count caps the pool if known
+        buffer = self._start_render(items, templates)
+
+        if count is None and hasattr(items, "__len__"):
+            count = len(items)
+        pool_size = int(self.smtp_config.get("pool_size", 1) or 1)
+        if count is not None:
+            pool_size = max(1, min(pool_size, count or 1))
+
+        workers = [
+            threading.Thread(
+                target=self._send_worker,
+                args=(buffer, progress_callback),
+                daemon=True,
+            )
+            for _ in range(pool_size)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def _next_item(self, buffer):
+        """
+        pick the next (position, record, rendered, attempt) to send: retries
+        that are due come first, then freshly rendered records. returns
+        (None, wait) when nothing is ready yet, with wait=None once every
+        message has a final outcome
+        """
+        due = self._retry_scheduler.pop_due()
+        if due is not None:
+            (position, record, rendered), attempt = due
+            return (position, record, rendered, attempt), 0
+
+        try:
+            position, record, rendered = buffer.get_nowait()
+            return (position, record, rendered, 0), 0
+        except queue.Empty:
+            pass
+
+        with self._status_lock:
+            if self._input_done and self._completed >= self.email_status["total"]:
+                return None, None
+
+        # the renderer may be behind, and other workers may still schedule
+        # retries for messages in flight
+        wait = self._retry_scheduler.next_due_in()
+        return None, 0.01 if wait is None else min(wait, 0.01)
+
+    def _mark(self, position, state, error=None):
+        # record a message state change in the outbox, if one is configured
+        if self.outbox is not None and self.campaign_id is not None:
+            self.outbox.mark(self.campaign_id, position, state, error)
+
+    def _connect(self):
+        # open the configured transport (an authenticated SMTP session by default)
+        transport = create_transport(self.smtp_config)
+        transport.open()
+        return transport
+
+    def _send_worker(self, buffer, progress_callback):
+        # drain the shared render buffer over a single transport session
+        try:
+            transport = self._connect()
+        except Exception as e:
+            print(f"SMTP Error: {e}")
+            return
 
+        try:
+            while True:
+                item, wait = self._next_item(buffer)
+                if item is None:
+                    if wait is None:
+                        break
+                    time.sleep(wait)
+                    continue
+
+                # wait for the rate limiter before each message
+                self._rate_limiter.acquire()
+                transport = self._send_record(transport, *item, progress_callback)
+                if transport is None:
+                    # session lost and could not be re-established
+                    break
+        finally:
+            if transport is not None:
+                transport.close()
+
+    def _send_record(
+        self, transport, position, record, rendered, attempt, progress_callback
+    ):
+        """
+        send a single record and log the outcome
+        if the session drops, it is re-established and the same record is
+        sent again. returns the transport to keep using, or None if the
+        session is gone for good
+        """
+        try:
+            if isinstance(rendered, Exception):
+                raise rendered
+            template_type, to_addr, message = rendered
+            self._mark(position, SENDING)
+
+            while True:
+                try:
+                    transport.send(self.smtp_config["sender_email"], to_addr, message)
+                    break
                 except Exception as e:
-                    self.email_status["failed"] += 1
-                    self.failed_emails.append(
-                        {
-                            "email": record.get("email", ""),
-                            "name": record.get("name", "Unknown"),
-                            "error": str(e),
-                        }
-                    )
-                    self.sending_log.append(
-                        {
-                            "email": record.get("email", ""),
-                            "name": record.get("name", "Unknown"),
-                            "status": "failed",
-                            "error": str(e),
-                            "timestamp": datetime.now(),
-                        }
-                    )
-
-                # update progress
-                if progress_callback:
-                    current_email = (
-                        f"{record.get('name', 'Unknown')} ({record.get('email', '')})"
-                    )
-                    progress_callback(i + 1, len(data), current_email)
-
-                # delay to prevent overwhelming the server
-                time.sleep(0.1)
-
-            server.quit()
+                    if not _is_connection_error(e):
+                        raise
+                    # drop the dead session first, even with no reconnects left
+                    transport.close()
+                    transport = None
+                    # resume the same record on a fresh session
+                    self._use_reconnect(e)
+                    transport = self._connect()
+
+            self._log_sent(record, template_type)
+            self._mark(position, SENT)
+            self._report_progress(record, progress_callback)
+
+        except Exception as e:
+            if self._on_send_error(position, record, rendered, attempt, e):
+                self._report_progress(record, progress_callback)
+            if _is_connection_error(e) and transport is not None:
+                transport.close()
+                transport = None
+
+        return transport
+
+    def _use_reconnect(self, error):
+        # take one reconnect from the per-run budget, or re-raise the drop
+        with self._status_lock:
+            if self.email_status["reconnects"] >= self.smtp_config.get(
+                "max_reconnects", 5
+            ):
+                raise error
+            self.email_status["reconnects"] += 1
+        print(f"SMTP connection lost ({error}), reconnecting")
+
+    def send_bulk_emails_async(
+        self,
+        data,
+        templates,
+        progress_callback=None,
+        max_in_flight=None,
+        rendered=None,
+        context=None,
+    ):
+        """
+        send bulk emails on a single asyncio event loop
+        up to max_in_flight SMTP transactions ("max_in_flight" in the SMTP
+        config, default 100) are kept in flight, one per connection, without
+        an OS thread per connection. blocks the calling thread until done
+
+        local sink transports (maildir/mbox/null) do no network I/O, so they
+        are written through the threaded pool instead
+        """
+        try:
+            self._begin_run(len(data), rendered, context=context)
+            if self.outbox is not None:
+                self.campaign_id = self.outbox.create_campaign(data)
+
+            if self.smtp_config.get("transport", "smtp") != "smtp":
+                self._run_pool(enumerate(data), templates, progress_callback, len(data))
+                return
+
+            if max_in_flight is None:
+                max_in_flight = self.smtp_config.get("max_in_flight", 100)
+            max_in_flight = max(1, min(int(max_in_flight), len(data) or 1))
+
+            asyncio.run(
+                self._send_bulk_async(data, templates, progress_callback, max_in_flight)
+            )
 
         except Exception as e:
             print(f"SMTP Error: {e}")
-            # add any remaining emails as failed if server connection failed
-            remaining_count = (
-                self.email_status["total"]
-                - self.email_status["sent"]
-                - self.email_status["failed"]
+        finally:
+            self._end_run()
+
+    async def _send_bulk_async(self, data, templates, progress_callback, max_in_flight):
+        buffer = self._start_render(enumerate(data), templates)
+
+        await asyncio.gather(
+            *(
+                self._async_send_worker(buffer, progress_callback)
+                for _ in range(max_in_flight)
             )
-            self.email_status["failed"] += remaining_count
+        )
+
+    async def _async_send_worker(self, buffer, progress_callback):
+        # drain the shared render buffer over a single async SMTP connection
+        try:
+            connection = await self._connect_async()
+        except Exception as e:
+            print(f"SMTP Error: {e}")
+            return
+
+        try:
+            while True:
+                item, wait = self._next_item(buffer)
+                if item is None:
+                    if wait is None:
+                        break
+                    await asyncio.sleep(wait)
+                    continue
+                position, record, rendered, attempt = item
+
+                # wait for the rate limiter before each message
+                wait = self._rate_limiter.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                try:
+                    if isinstance(rendered, Exception):
+                        raise rendered
+                    template_type, to_addr, message = rendered
+                    self._mark(position, SENDING)
+                    while True:
+                        try:
+                            await connection.sendmail(
+                                self.smtp_config["sender_email"], to_addr, message
+                            )
+                            break
+                        except Exception as e:
+                            if not _is_connection_error(e):
+                                raise
+                            # resume the same record on a fresh connection
+                            self._use_reconnect(e)
+                            connection.close()
+                            connection = None
+                            connection = await self._connect_async()
+                    self._log_sent(record, template_type)
+                    self._mark(position, SENT)
+                    self._report_progress(record, progress_callback)
+                except Exception as e:
+                    if self._on_send_error(position, record, rendered, attempt, e):
+                        self._report_progress(record, progress_callback)
+                    if _is_connection_error(e) and connection is not None:
+                        connection.close()
+                        connection = None
+
+                if connection is None:
+                    break
         finally:
-            self.is_sending = False
+            if connection is not None:
+                try:
+                    await connection.quit()
+                except Exception:
+                    connection.close()
+
+    async def _connect_async(self):
+        # open an authenticated async SMTP connection
+        connection = AsyncSMTPConnection(
+            self.smtp_config["smtp_server"], self.smtp_config["smtp_port"]
+        )
+        try:
+            await connection.connect()
+            if self.smtp_config.get("use_tls", True):
+                await connection.starttls()
+            await connection.login(
+                self.smtp_config["sender_email"], self.smtp_config["sender_password"]
+            )
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def _create_rate_limiter(self, config):
+        return RateLimiter.from_profile(config.get("rate_profile", "default"))
+
+    def _on_send_error(self, position, record, rendered, attempt, error):
+        """
+        handle a failed attempt: slow down on throttling replies, defer
+        transient (4xx) failures to the retry queue and record everything
+        else as failed. returns True if the failure is final
+        """
+        if reply_code(error) in THROTTLE_CODES:
+            self._rate_limiter.throttle()
+
+        failure_class = classify_failure(error)
+        if failure_class == TRANSIENT and self._retry_scheduler.schedule(
+            (position, record, rendered), attempt + 1
+        ):
+            with self._status_lock:
+                self.email_status["retries"] += 1
+            self._mark(position, QUEUED, str(error))
+            return False
+
+        self._log_failed(record, error, failure_class)
+        self._mark(position, FAILED, str(error))
+        return True
+
+    def _log_sent(self, record, template_type):
+        with self._status_lock:
+            self.email_status["sent"] += 1
+            self.sending_log.append(
+                {
+                    "email": record.get("email", ""),
+                    "name": record.get("name", "Unknown"),
+                    "status": "sent",
+                    "template": template_type,
+                    "timestamp": datetime.now(),
+                }
+            )
+
+    def _log_failed(self, record, error, failure_class=None):
+        with self._status_lock:
+            self.email_status["failed"] += 1
+            self.failed_emails.append(
+                {
+                    "email": record.get("email", ""),
+                    "name": record.get("name", "Unknown"),
+                    "error": str(error),
+                    "failure_class": failure_class or classify_failure(error),
+                }
+            )
+            self.sending_log.append(
+                {
+                    "email": record.get("email", ""),
+                    "name": record.get("name", "Unknown"),
+                    "status": "failed",
+                    "error": str(error),
+                    "timestamp": datetime.now(),
+                }
+            )
+
+    def _report_progress(self, record, progress_callback):
+        # progress is reported under the lock so "current" stays monotonic
+        with self._status_lock:
+            self._completed += 1
+            if progress_callback:
+                current_email = (
+                    f"{record.get('name', 'Unknown')} ({record.get('email', '')})"
+                )
+                progress_callback(
+                    self._completed, self.email_status["total"], current_email
+                )
 
     def send_emails(
         self,
@@ -144,6 +608,8 @@ class EmailManager:
                 self.is_sending = True
                 self.reset_status()
                 self.email_status["total"] = len(data)
+                self._rate_limiter = self._create_rate_limiter(smtp_config)
+                context = RenderContext()
 
                 # connect to SMTP server
                 server = smtplib.SMTP(smtp_config["server"], smtp_config["port"])
@@ -151,6 +617,9 @@ class EmailManager:
                 server.login(smtp_config["email"], smtp_config["password"])
 
                 for i, record in enumerate(data):
+                    # wait for the rate limiter before each message
+                    self._rate_limiter.acquire()
+
                     try:
                         # determine template type
                         template_type = template_manager.determine_template_type(record)
@@ -161,11 +630,11 @@ class EmailManager:
                         msg["From"] = smtp_config["email"]
                         msg["To"] = record.get("email", "")
                         msg["Subject"] = template_manager.replace_placeholders(
-                            template["subject"], record
+                            template["subject"], record, context
                         )
 
                         body = template_manager.replace_placeholders(
-                            template["body"], record
+                            template["body"], record, context
                         )
                         msg.attach(MIMEText(body, "plain"))
 
@@ -188,12 +657,15 @@ class EmailManager:
                         )
 
                     except Exception as e:
+                        if reply_code(e) in THROTTLE_CODES:
+                            self._rate_limiter.throttle()
                         self.email_status["failed"] += 1
                         self.failed_emails.append(
                             {
                                 "email": record.get("email", ""),
                                 "name": record.get("name", "Unknown"),
                                 "error": str(e),
+                                "failure_class": classify_failure(e),
                             }
                         )
                         self.sending_log.append(
@@ -210,9 +682,6 @@ class EmailManager:
                     if progress_callback:
                         progress_callback(i + 1, len(data))
 
-                    # delay to prevent overwhelming the server
-                    time.sleep(0.1)
-
                 server.quit()
 
             except Exception as e:
@@ -229,13 +698,12 @@ class EmailManager:
         if "off_track_category" in record:
             category = record["off_track_category"]
             # ensure the category maps to a valid template
-            valid_categories = ["significantly", "moderately", "slightly", "on_track"]
-            if category in valid_categories:
+            if category in self.category_rules.categories:
                 return category
 
         # fallback to manual calculation for backward compatibility
-        hours_behind = record.get("hours_behind", record.get("off_the_job", 0))
-        days_absent = record.get("days_absent", record.get("last_attended", 0))
+        hours_behind = record.get("off_the_job", 0)
+        days_absent = record.get("last_attended", 0)
 
         # convert to numeric values if they're strings
         try:
@@ -245,77 +713,58 @@ class EmailManager:
             hours_behind = 0
             days_absent = 0
 
-        if hours_behind >= 30 and days_absent > 30:
-            return "significantly"
-        elif hours_behind >= 15:
-            return "moderately"
-        elif hours_behind > 10:
-            return "slightly"
-        else:
-            return "on_track"
+        return self.category_rules.categorize(hours_behind, days_absent)
 
     def _replace_placeholders(self, text, record):
         if not text:
             return ""
 
-        # generate comprehensive replacement dictionary
-        replacements = self._generate_replacements(record)
-
-        result = text
-        for placeholder, value in replacements.items():
-            result = result.replace(placeholder, str(value))
-
-        return result
+        # campaign-wide values (dates) sit under the per-record ones
+        if self._render_context is None:
+            self._render_context = RenderContext()
+        template = compile_template(text)
+        values = self._render_context.layer(
+            self._generate_replacements(record, template.placeholders)
+        )
 
-    def _generate_replacements(self, record):
-        # generate comprehensive replacement dictionary for placeholders
-        from datetime import datetime, timedelta
+        # single pass over the compiled (cached) template
+        return template.render(values)
 
+    def _generate_replacements(self, record, placeholders=None):
+        """
+        generate comprehensive replacement dictionary for placeholders
+        only the placeholder names given are computed (all of them if None)
+        """
         replacements = {}
+        needed = placeholders
+        if placeholders is None:
+            needed = DERIVED_PLACEHOLDERS
+            placeholders = record.keys()
 
         # direct field replacements
-        for key, value in record.items():
-            placeholder = f"{{{key}}}"
-            replacements[placeholder] = str(value) if value is not None else ""
-
-        # calculated/derived replacements
-        current_date = datetime.now()
-
-        # power hour date (5 days from today)
-        power_hour_date = current_date + timedelta(days=5)
-        replacements["{power_hour_date}"] = power_hour_date.strftime("%A, %B %d, %Y")
-
-        # deadline date (one week from today)
-        deadline_date = current_date + timedelta(days=7)
-        replacements["{deadline_date}"] = deadline_date.strftime("%A, %B %d, %Y")
-
-        # handle common field variations and defaults
-        replacements["{name}"] = record.get(
-            "name", record.get("Name", record.get("apprentice_name", "there"))
-        )
-        replacements["{email}"] = record.get(
-            "email", record.get("Email", record.get("email_address", ""))
-        )
+        for key in placeholders:
+            if key in record:
+                value = record[key]
+                replacements[f"{{{key}}}"] = str(value) if value is not None else ""
+
+        # canonical fields (aliases and types are resolved at ingest by
+        # DataProcessor.preprocess_data), with defaults for bare records
+        if "name" in needed:
+            replacements["{name}"] = record.get("name", "there")
+        if "email" in needed:
+            replacements["{email}"] = record.get("email", "")
 
         # manager information
-        replacements["{manager_name}"] = record.get(
-            "manager_name", record.get("Manager", "your manager")
-        )
-        replacements["{manager_email}"] = record.get(
-            "manager_email", record.get("manager_email_address", "")
-        )
+        if "manager_name" in needed:
+            replacements["{manager_name}"] = record.get("manager_name", "your manager")
+        if "manager_email" in needed:
+            replacements["{manager_email}"] = record.get("manager_email", "")
 
-        # handle hours and days with better formatting
-        hours_behind = record.get("off_the_job", record.get("hours_behind", 0))
-        days_absent = record.get("last_attended", record.get("days_absent", 0))
+        if needed.isdisjoint(NUMERIC_PLACEHOLDERS):
+            return replacements
 
-        # ensure numeric values
-        try:
-            hours_behind = int(hours_behind) if hours_behind else 0
-            days_absent = int(days_absent) if days_absent else 0
-        except (ValueError, TypeError):
-            hours_behind = 0
-            days_absent = 0
+        hours_behind = record.get("off_the_job", 0)
+        days_absent = record.get("last_attended", 0)
 
         replacements["{off_the_job}"] = str(hours_behind)
         replacements["{hours_behind}"] = str(hours_behind)
@@ -331,6 +780,12 @@ class EmailManager:
         # get current email sending status
         return self.email_status.copy()
 
+    def get_render_stats(self):
+        # bytes and render time per message for the last run
+        if self._renderer is None:
+            return {}
+        return self._renderer.get_stats()
+
     def get_failed_emails(self):
         # get list of failed emails
         return self.failed_emails.copy()
@@ -358,12 +813,23 @@ class EmailManager:
         report += f"Total emails to send: {self.email_status['total']}\n"
         report += f"Successfully sent: {self.email_status['sent']}\n"
         report += f"Failed to send: {self.email_status['failed']}\n"
+        if self.email_status.get("reconnects"):
+            report += f"Reconnects: {self.email_status['reconnects']}\n"
+        if self.email_status.get("retries"):
+            report += f"Retried attempts: {self.email_status['retries']}\n"
 
         if self.email_status["total"] > 0:
             success_rate = self.get_success_rate()
             report += f"Success rate: {success_rate:.1f}%\n\n"
 
         if self.failed_emails:
+            report += "Failures by class:\n"
+            report += "-" * 20 + "\n"
+            for failure_class, count in self.get_failure_breakdown().items():
+                label = FAILURE_CLASS_LABELS.get(failure_class, failure_class)
+                report += f"• {label}: {count}\n"
+            report += "\n"
+
             report += "Failed Emails:\n"
             report += "-" * 20 + "\n"
             for failed in self.failed_emails:
@@ -380,6 +846,14 @@ class EmailManager:
 
         return report
 
+    def get_failure_breakdown(self):
+        # count final failures per class (transient/permanent/other)
+        breakdown = {}
+        for failed in self.failed_emails:
+            failure_class = failed.get("failure_class", "other")
+            breakdown[failure_class] = breakdown.get(failure_class, 0) + 1
+        return breakdown
+
     def get_template_usage_stats(self):
         # get statistics on which templates were used
         template_stats = {}
@@ -0,0 +1,136 @@
+import hashlib
+import os
+
+from core.app_data import app_data_dir
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # the cache is simply disabled without pyarrow
+    feather = None
+
+HASH_BLOCK_SIZE = 1024 * 1024
+PARTS = ("raw", "processed")
+
+
+class FrameCache:
+    """
+    on-disk cache of parsed and preprocessed DataFrames
+
+    entries are uncompressed Arrow IPC (feather) files, keyed by a hash of
+    the source file's bytes plus the preprocessing version, so re-opening
+    the same export is a memory-mapped read instead of a full re-parse.
+    the directory is kept under max_bytes by evicting the least recently
+    used entries, and frames too large to fit are not cached at all. the
+    default directory is under the per-user application data directory, as
+    entries hold full copies of the uploaded data. everything is a no-op
+    when pyarrow is not installed
+    """
+
+    def __init__(self, directory=None, max_bytes=512 * 1024 * 1024):
+        self.directory = directory or app_data_dir("data_cache")
+        self.max_bytes = max_bytes
+        self.enabled = feather is not None
+
+    def file_digest(self, file_path):
+        # content hash of the source file
+        digest = hashlib.blake2b(digest_size=20)
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def key(self, file_digest, version):
+        # entry key for a source file under a preprocessing version
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{file_digest}:{version}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        # (raw, processed) DataFrames for key, or None on a miss
+        if not self.enabled:
+            return None
+
+        paths = [self._path(key, part) for part in PARTS]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+
+        try:
+            frames = tuple(
+                feather.read_table(path, memory_map=True).to_pandas() for path in paths
+            )
+        except Exception as e:
+            print(f"Error reading cached data: {e}")
+            self._remove(key)
+            return None
+
+        # reading counts as a use for LRU eviction
+        for path in paths:
+            os.utime(path)
+        return frames
+
+    def put(self, key, raw, processed):
+        if not self.enabled:
+            return False
+
+        # an entry that cannot fit would be written only to be evicted again
+        size = sum(
+            int(frame.memory_usage(deep=True).sum()) for frame in (raw, processed)
+        )
+        if size > self.max_bytes:
+            return False
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for part, frame in zip(PARTS, (raw, processed)):
+                path = self._path(key, part)
+                temp_path = path + ".tmp"
+                feather.write_feather(
+                    frame.reset_index(drop=True),
+                    temp_path,
+                    compression="uncompressed",
+                )
+                os.replace(temp_path, path)
+        except Exception as e:
+            # e.g. columns with mixed types that Arrow cannot store
+            print(f"Error caching data: {e}")
+            self._remove(key)
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self):
+        # drop least recently used entries until the cache fits max_bytes
+        entries = {}
+        for name in os.listdir(self.directory):
+            if not name.endswith(".arrow"):
+                continue
+            path = os.path.join(self.directory, name)
+            key = name.split(".", 1)[0]
+            size, used = entries.get(key, (0, 0))
+            entries[key] = (
+                size + os.path.getsize(path),
+                max(used, os.path.getmtime(path)),
+            )
+
+        total = sum(size for size, _ in entries.values())
+        for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".arrow"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def _path(self, key, part):
+        return os.path.join(self.directory, f"{key}.{part}.arrow")
+
+    def _remove(self, key):
+        for part in PARTS:
+            for path in (self._path(key, part), self._path(key, part) + ".tmp"):
+                if os.path.exists(path):
+                    os.remove(path)
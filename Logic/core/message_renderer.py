@@ -0,0 +1,160 @@
+import queue
+import threading
+import time
+from email.header import Header
+from email import quoprimime
+
+CRLF = b"\r\n"
+MAX_LINE_LENGTH = 998  # RFC 5321 limit for 7bit lines
+
+
+class MessageRenderer:
+    """
+    renders records straight into wire-ready single-part text/plain messages
+
+    the header lines shared by every template of a run (From, MIME-Version,
+    Content-Type) are encoded once up front, so each record only costs the
+    placeholder replacement plus its To/Subject headers and body
+    """
+
+    def __init__(
+        self, sender, templates, determine_template_type, replace_placeholders
+    ):
+        self.sender = sender
+        self.templates = templates
+        self.determine_template_type = determine_template_type
+        self.replace_placeholders = replace_placeholders
+
+        self.header_block = self._header_block()
+
+        self._stats_lock = threading.Lock()
+        self.messages = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def _header_block(self):
+        return (
+            b"From: "
+            + _encode_header(self.sender)
+            + CRLF
+            + b"MIME-Version: 1.0"
+            + CRLF
+            + b'Content-Type: text/plain; charset="utf-8"'
+            + CRLF
+        )
+
+    def render(self, record, prerendered=None):
+        """
+        return (template_type, recipient, message bytes) for a record
+        prerendered is an optional (template_type, subject, body) from the
+        batch renderer, which skips the per-record placeholder work
+        """
+        started = time.perf_counter()
+
+        to_addr = record.get("email", "")
+        if prerendered is not None and prerendered[1] is not None:
+            template_type, subject, body = prerendered
+        else:
+            template_type = self.determine_template_type(record)
+            template = self.templates.get(
+                template_type, self.templates.get("on_track", {})
+            )
+
+            if not template:
+                raise Exception(f"No template found for type: {template_type}")
+
+            subject = self.replace_placeholders(template.get("subject", ""), record)
+            body = self.replace_placeholders(template.get("body", ""), record)
+
+        encoding, payload = _encode_body(body)
+        data = b"".join(
+            (
+                self.header_block,
+                b"To: ",
+                _encode_header(to_addr),
+                CRLF,
+                b"Subject: ",
+                _encode_header(subject),
+                CRLF,
+                b"Content-Transfer-Encoding: ",
+                encoding,
+                CRLF,
+                CRLF,
+                payload,
+            )
+        )
+
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.messages += 1
+            self.bytes += len(data)
+            self.seconds += elapsed
+
+        return template_type, to_addr, data
+
+    def get_stats(self):
+        with self._stats_lock:
+            messages = self.messages or 1
+            return {
+                "messages": self.messages,
+                "bytes": self.bytes,
+                "render_seconds": self.seconds,
+                "bytes_per_message": self.bytes / messages,
+                "render_ms_per_message": self.seconds * 1000 / messages,
+            }
+
+    def start(self, items, buffer_size=256, prerendered=None):
+        """
+        render items ((position, record) pairs) on a background thread into
+        a bounded buffer of (position, record, rendered) entries, where
+        rendered is the render() result or the exception it raised
+        prerendered, if given, is indexed by position
+        returns (buffer, stop_event)
+        """
+        buffer = queue.Queue(maxsize=buffer_size)
+        stop = threading.Event()
+
+        def produce():
+            for position, record in items:
+                try:
+                    if prerendered is not None:
+                        rendered = self.render(record, prerendered[position])
+                    else:
+                        rendered = self.render(record)
+                except Exception as e:
+                    rendered = e
+
+                while not stop.is_set():
+                    try:
+                        buffer.put((position, record, rendered), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+
+        threading.Thread(target=produce, daemon=True).start()
+        return buffer, stop
+
+
+def _encode_header(value):
+    value = str(value)
+    # values come from spreadsheet cells; a line break would start a new header
+    if "\r" in value or "\n" in value:
+        raise ValueError(f"Header value contains a line break: {value!r}")
+    if value.isascii() and len(value) < MAX_LINE_LENGTH - 10:
+        return value.encode("ascii")
+    # folded lines must use CRLF like the rest of the message
+    return Header(value, "utf-8").encode(linesep="\r\n").encode("ascii")
+
+
+def _encode_body(body):
+    # 7bit when the body is plain ASCII with short lines, else quoted-printable
+    lines = body.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if body.isascii() and all(len(line) <= MAX_LINE_LENGTH for line in lines):
+        return b"7bit", "\r\n".join(lines).encode("ascii") + CRLF
+
+    # quoprimime works on one character per byte
+    utf8 = body.encode("utf-8").decode("latin-1")
+    encoded = quoprimime.body_encode(utf8, eol="\r\n")
+    return b"quoted-printable", encoded.encode("ascii") + CRLF
@@ -0,0 +1,260 @@
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from core.app_data import app_data_dir
+
+QUEUED = "queued"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+UNFINISHED_STATES = (QUEUED, SENDING)
+
+# records serialised per executemany when a campaign is created
+CHUNK_SIZE = 10000
+
+
+def default_outbox_path():
+    # outbox.db in the per-user application data directory
+    return os.path.join(app_data_dir(), "outbox.db")
+
+
+class Outbox:
+    """
+    durable per-message send state for bulk runs, stored in SQLite (WAL mode)
+
+    every message moves queued -> sending -> sent/failed. state changes are
+    buffered and written in batched transactions so the send loop never
+    waits on a commit per message; after a crash at most one batch of
+    state changes (batch_size messages or flush_interval seconds) is lost,
+    and those messages are sent again on resume
+    """
+
+    def __init__(self, path="outbox.db", batch_size=200, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._pending = {}  # (campaign_id, position) -> (state, error, updated_at)
+        self._last_flush = time.monotonic()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS campaigns (
+                id TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                total INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                campaign_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                email TEXT,
+                name TEXT,
+                record TEXT NOT NULL,
+                state TEXT NOT NULL,
+                error TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (campaign_id, position)
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_state
+                ON messages (campaign_id, state);
+            """)
+        self._conn.commit()
+
+    def create_campaign(self, records, campaign_id=None):
+        """
+        store every record as queued in a single transaction. records are
+        serialised CHUNK_SIZE at a time, so a lazy sequence (RecordView) is
+        never held as dicts all at once
+        """
+        campaign_id = campaign_id or uuid.uuid4().hex
+        now = datetime.now().isoformat()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO campaigns (id, created_at, total) VALUES (?, ?, ?)",
+                (campaign_id, now, len(records)),
+            )
+            records = iter(records)
+            start = 0
+            while True:
+                chunk = list(itertools.islice(records, CHUNK_SIZE))
+                if not chunk:
+                    break
+                self._insert_messages(campaign_id, chunk, start, now)
+                start += len(chunk)
+
+        return campaign_id
+
+    def add_records(self, campaign_id, records, start):
+        # append a chunk of a streamed campaign, numbered from start
+        now = datetime.now().isoformat()
+
+        with self._lock, self._conn:
+            self._insert_messages(campaign_id, records, start, now)
+            self._conn.execute(
+                "UPDATE campaigns SET total = total + ? WHERE id = ?",
+                (len(records), campaign_id),
+            )
+
+    def _insert_messages(self, campaign_id, records, start, now):
+        # queued rows for records, numbered from start (caller holds the lock)
+        self._conn.executemany(
+            "INSERT INTO messages (campaign_id, position, email, name, record,"
+            " state, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    campaign_id,
+                    start + offset,
+                    str(record.get("email", "")),
+                    str(record.get("name", "")),
+                    json.dumps(record, default=str),
+                    QUEUED,
+                    now,
+                )
+                for offset, record in enumerate(records)
+            ),
+        )
+
+    def mark(self, campaign_id, position, state, error=None):
+        # buffer a state change; later changes to the same message win
+        with self._lock:
+            self._pending[(campaign_id, position)] = (
+                state,
+                error,
+                datetime.now().isoformat(),
+            )
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if due:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+
+        updates = [
+            (state, error, updated_at, campaign_id, position)
+            for (campaign_id, position), (
+                state,
+                error,
+                updated_at,
+            ) in self._pending.items()
+        ]
+        self._pending = {}
+
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE messages SET state = ?, error = ?, updated_at = ?"
+                " WHERE campaign_id = ? AND position = ?",
+                updates,
+            )
+
+    def unfinished(self, campaign_id, include_failed=False):
+        # return [(position, record)] for messages that were never completed
+        states = UNFINISHED_STATES + ((FAILED,) if include_failed else ())
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT position, record FROM messages WHERE campaign_id = ?"
+                f" AND state IN ({', '.join('?' for _ in states)})"
+                " ORDER BY position",
+                (campaign_id, *states),
+            )
+            return [(position, json.loads(record)) for position, record in cursor]
+
+    def campaign_started_at(self, campaign_id):
+        # when the campaign was created, or None if it is unknown
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at FROM campaigns WHERE id = ?", (campaign_id,)
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def campaign_summary(self, campaign_id):
+        # count messages per state
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT state, COUNT(*) FROM messages WHERE campaign_id = ?"
+                " GROUP BY state",
+                (campaign_id,),
+            )
+            summary = {QUEUED: 0, SENDING: 0, SENT: 0, FAILED: 0}
+            summary.update(dict(cursor.fetchall()))
+            return summary
+
+    def unfinished_campaigns(self, include_failed=False):
+        # campaigns with queued/sending (or failed) messages left, newest first
+        states = UNFINISHED_STATES + ((FAILED,) if include_failed else ())
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT c.id, c.created_at, c.total, COUNT(m.position)"
+                " FROM campaigns c JOIN messages m ON m.campaign_id = c.id"
+                f" WHERE m.state IN ({', '.join('?' for _ in states)})"
+                " GROUP BY c.id ORDER BY c.created_at DESC",
+                states,
+            )
+            return [
+                {
+                    "campaign_id": campaign_id,
+                    "created_at": created_at,
+                    "total": total,
+                    "unfinished": unfinished,
+                }
+                for campaign_id, created_at, total, unfinished in cursor
+            ]
+
+    def prune_finished(self):
+        """
+        delete campaigns whose messages were all sent, so the database does
+        not keep every record ever sent. campaigns with failed messages stay
+        until dismissed, so the failures can still be retried. returns the
+        number of campaigns removed
+        """
+        self.flush()
+        with self._lock, self._conn:
+            finished = [
+                campaign_id
+                for (campaign_id,) in self._conn.execute(
+                    "SELECT id FROM campaigns WHERE id NOT IN"
+                    " (SELECT campaign_id FROM messages WHERE state != ?)",
+                    (SENT,),
+                )
+            ]
+            for campaign_id in finished:
+                self._delete_campaign(campaign_id)
+        return len(finished)
+
+    def dismiss_campaign(self, campaign_id):
+        # forget a campaign and its messages, e.g. once its failures are given up
+        self.flush()
+        with self._lock, self._conn:
+            self._delete_campaign(campaign_id)
+
+    def _delete_campaign(self, campaign_id):
+        # callers hold the lock and a transaction
+        self._conn.execute("DELETE FROM messages WHERE campaign_id = ?", (campaign_id,))
+        self._conn.execute("DELETE FROM campaigns WHERE id = ?", (campaign_id,))
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
@@ -0,0 +1,113 @@
+import threading
+import time
+
+# named sending limits, in messages per window
+# (None means the window is not limited)
+RATE_PROFILES = {
+    "default": {"per_second": 10, "per_minute": None, "per_day": None},
+    "gmail": {"per_second": 2, "per_minute": 60, "per_day": 500},
+    "google_workspace": {"per_second": 5, "per_minute": 120, "per_day": 2000},
+    "office365": {"per_second": 1, "per_minute": 30, "per_day": 10000},
+    "local_relay": {"per_second": 200, "per_minute": None, "per_day": None},
+    # no limits at all, meant for local sinks and benchmarks
+    "unlimited": {"per_second": None, "per_minute": None, "per_day": None},
+}
+
+# SMTP replies that mean "slow down"
+THROTTLE_CODES = (421, 451)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity, now):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now, scale=1.0):
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate * scale)
+        self.updated = now
+
+    def wait_time(self, scale=1.0):
+        # seconds until one token is available
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / (self.rate * scale)
+
+
+class RateLimiter:
+    """
+    thread-safe token-bucket limiter over per-second/minute/day windows
+    callers only sleep when a bucket is empty. limits apply to a single
+    process run, they are not persisted between runs
+    """
+
+    def __init__(
+        self,
+        per_second=None,
+        per_minute=None,
+        per_day=None,
+        recovery_interval=60.0,
+        min_scale=0.05,
+        clock=time.monotonic,
+    ):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.recovery_interval = recovery_interval
+        self.min_scale = min_scale
+        self.scale = 1.0  # fraction of the configured rate currently allowed
+        self.throttle_count = 0
+        self._last_throttle = None
+
+        now = clock()
+        self.buckets = []
+        for limit, window in ((per_second, 1), (per_minute, 60), (per_day, 86400)):
+            if limit:
+                self.buckets.append(TokenBucket(limit / window, limit, now))
+
+    @classmethod
+    def from_profile(cls, name, **overrides):
+        if name not in RATE_PROFILES:
+            raise ValueError(f"Unknown rate profile: {name}")
+        limits = dict(RATE_PROFILES[name])
+        limits.update(overrides)
+        return cls(**limits)
+
+    def reserve(self):
+        # take one token and return how long the caller must wait before sending
+        with self._lock:
+            now = self._clock()
+            self._recover(now)
+
+            wait = 0.0
+            for bucket in self.buckets:
+                bucket.refill(now, self.scale)
+                wait = max(wait, bucket.wait_time(self.scale))
+
+            # tokens may go negative so concurrent callers queue up behind each other
+            for bucket in self.buckets:
+                bucket.tokens -= 1
+
+            return wait
+
+    def acquire(self):
+        # block until a message may be sent
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttle(self, factor=0.5):
+        # cut the allowed rate after a 421/451 reply from the server
+        with self._lock:
+            self.scale = max(self.min_scale, self.scale * factor)
+            self.throttle_count += 1
+            self._last_throttle = self._clock()
+
+    def _recover(self, now):
+        # double the rate again after each quiet recovery interval
+        if self.scale >= 1.0 or self._last_throttle is None:
+            return
+        if now - self._last_throttle >= self.recovery_interval:
+            self.scale = min(1.0, self.scale * 2)
+            self._last_throttle = now
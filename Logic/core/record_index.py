@@ -0,0 +1,174 @@
+import sys
+
+import numpy as np
+
+from core.record_view import NUMERIC_ALIASES
+
+# fields answered from a sorted array: value >= query
+NUMERIC_INDEX_FIELDS = ("off_the_job", "last_attended")
+
+# fields answered from an n-gram index: case-insensitive substring
+TEXT_INDEX_FIELDS = ("name", "first_name", "email", "manager_name", "manager_email")
+
+NGRAM = 3
+
+
+class RecordIndex:
+    """
+    secondary indexes over a processed DataFrame for search_records
+
+    numeric fields keep their row positions sorted by value, so a ">= value"
+    query is one bisection. text fields keep an n-gram -> positions map of
+    their lowercased values; a substring query intersects the posting lists
+    of its n-grams and only checks the few rows left. every index is built
+    the first time a query needs it, and results are positions in file order
+    """
+
+    def __init__(self, dataframe):
+        self.dataframe = dataframe
+        self._sorted = {}  # field -> (sorted values, positions in that order)
+        self._lowered = {}  # field -> lowercased string values
+        self._ngrams = {}  # field -> {ngram: sorted positions}
+        self._columns = {}  # field -> column values as a list
+
+    def search(self, **criteria):
+        # positions matching every criterion, in file order
+        criteria = {
+            NUMERIC_ALIASES.get(field, field): value
+            for field, value in criteria.items()
+        }
+        candidates = None
+        rest = {}
+
+        # indexed criteria narrow the candidates by intersection
+        for field, value in criteria.items():
+            if field not in self.dataframe:
+                rest[field] = value
+                continue
+            if field in NUMERIC_INDEX_FIELDS:
+                positions = self._at_least(field, value)
+            elif field in TEXT_INDEX_FIELDS and len(str(value)) >= NGRAM:
+                positions = self._ngram_candidates(field, str(value).lower())
+            else:
+                rest[field] = value
+                continue
+            candidates = (
+                positions
+                if candidates is None
+                else np.intersect1d(candidates, positions, assume_unique=True)
+            )
+            if not len(candidates):
+                return []
+
+        if candidates is None:
+            candidates = range(len(self.dataframe))
+        else:
+            candidates = np.sort(candidates).tolist()
+
+        # longer queries can match every n-gram but not the whole substring
+        for field, value in criteria.items():
+            query = str(value).lower()
+            if field in TEXT_INDEX_FIELDS and field not in rest and len(query) > NGRAM:
+                candidates = self._contains(field, query, candidates)
+
+        # anything without an index is checked on the remaining rows only
+        for field, value in rest.items():
+            candidates = self._filter(field, value, candidates)
+
+        return list(candidates)
+
+    def memory_usage(self):
+        # approximate bytes held by the indexes built so far
+        total = sum(
+            values.nbytes + order.nbytes for values, order in self._sorted.values()
+        )
+        for ngrams in self._ngrams.values():
+            total += sys.getsizeof(ngrams) + sum(
+                sys.getsizeof(gram) + posting.nbytes for gram, posting in ngrams.items()
+            )
+        for values in (*self._lowered.values(), *self._columns.values()):
+            total += sys.getsizeof(values) + sum(map(sys.getsizeof, values))
+        return total
+
+    def _at_least(self, field, value):
+        if field not in self._sorted:
+            values = self.dataframe[field].to_numpy()
+            order = np.argsort(values, kind="stable")
+            self._sorted[field] = (values[order], order)
+
+        values, order = self._sorted[field]
+        return order[np.searchsorted(values, value, side="left") :]
+
+    def _ngram_candidates(self, field, query):
+        ngrams = self._ngram_index(field)
+        postings = []
+        for start in range(len(query) - NGRAM + 1):
+            posting = ngrams.get(query[start : start + NGRAM])
+            if posting is None:
+                return np.empty(0, dtype=np.intp)
+            postings.append(posting)
+
+        # intersect starting from the rarest n-gram
+        postings.sort(key=len)
+        positions = postings[0]
+        for posting in postings[1:]:
+            positions = np.intersect1d(positions, posting, assume_unique=True)
+            if not len(positions):
+                break
+        return positions
+
+    def _ngram_index(self, field):
+        if field not in self._ngrams:
+            ngrams = {}
+            for position, text in enumerate(self._lowered_values(field)):
+                for gram in {
+                    text[start : start + NGRAM]
+                    for start in range(len(text) - NGRAM + 1)
+                }:
+                    posting = ngrams.get(gram)
+                    if posting is None:
+                        ngrams[gram] = [position]
+                    else:
+                        posting.append(position)
+            self._ngrams[field] = {
+                gram: np.array(posting, dtype=np.intp)
+                for gram, posting in ngrams.items()
+            }
+        return self._ngrams[field]
+
+    def _lowered_values(self, field):
+        if field not in self._lowered:
+            self._lowered[field] = [
+                str(value).lower() for value in self.dataframe[field].tolist()
+            ]
+        return self._lowered[field]
+
+    def _contains(self, field, query, candidates):
+        values = self._lowered_values(field)
+        return [position for position in candidates if query in values[position]]
+
+    def _filter(self, field, value, candidates):
+        # the unindexed search_records semantics, over candidates only
+        if field not in self.dataframe:
+            column = None
+        else:
+            if field not in self._columns:
+                self._columns[field] = self.dataframe[field].tolist()
+            column = self._columns[field]
+
+        if field in NUMERIC_INDEX_FIELDS:
+            if column is None:
+                return list(candidates) if 0 >= value else []
+            return [position for position in candidates if column[position] >= value]
+
+        if field in TEXT_INDEX_FIELDS:
+            return self._contains(field, str(value).lower(), candidates)
+
+        query = str(value).lower()
+        if column is None:
+            return list(candidates) if query in "" else []
+        return [
+            position
+            for position in candidates
+            if query in str(column[position]).lower()
+        ]
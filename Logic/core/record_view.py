@@ -0,0 +1,51 @@
+from collections.abc import Sequence
+
+# record fields that are views of another column, for template compatibility
+NUMERIC_ALIASES = {"hours_behind": "off_the_job", "days_absent": "last_attended"}
+
+CHUNK_SIZE = 10000
+
+
+class RecordView(Sequence):
+    """
+    read-only list of record dicts backed by a processed DataFrame
+
+    dicts are built only when they are accessed, a chunk at a time when
+    iterating, so the cohort is never held twice. records carry the
+    hours_behind/days_absent aliases without the DataFrame storing them.
+    every access builds fresh dicts: changes go through the DataFrame
+    """
+
+    def __init__(self, dataframe):
+        self.dataframe = dataframe
+
+    def __len__(self):
+        return len(self.dataframe)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return self._records(self.dataframe.iloc[position])
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("record index out of range")
+        return self._records(self.dataframe.iloc[position : position + 1])[0]
+
+    def __iter__(self):
+        for start in range(0, len(self), CHUNK_SIZE):
+            yield from self._records(self.dataframe.iloc[start : start + CHUNK_SIZE])
+
+    def take(self, positions):
+        # records at the given positions, built in one pass
+        return self._records(self.dataframe.iloc[positions])
+
+    def _records(self, frame):
+        # native Python values, like DataFrame.to_dict("records") but built
+        # from one tolist() per column, which is several times faster
+        names = list(frame.columns)
+        columns = [frame[name].tolist() for name in names]
+        for alias, field in NUMERIC_ALIASES.items():
+            if field in names and alias not in names:
+                names.append(alias)
+                columns.append(columns[names.index(field)])
+        return [dict(zip(names, row)) for row in zip(*columns)]
@@ -0,0 +1,55 @@
+from collections import ChainMap
+from datetime import datetime, timedelta
+
+# one date format for every email and preview
+DATE_FORMAT = "%A, %B %d, %Y"
+
+POWER_HOUR_DAYS = 5  # power hour session, days after the campaign starts
+DEADLINE_DAYS = 7  # logging deadline, days after the campaign starts
+
+# placeholders that need the hours/days coercion
+NUMERIC_PLACEHOLDERS = frozenset(
+    {
+        "off_the_job",
+        "hours_behind",
+        "last_attended",
+        "days_absent",
+        "hours_plural",
+        "days_plural",
+    }
+)
+# placeholders EmailManager._generate_replacements derives from a record
+DERIVED_PLACEHOLDERS = NUMERIC_PLACEHOLDERS | {
+    "name",
+    "email",
+    "manager_name",
+    "manager_email",
+}
+
+
+class RenderContext:
+    """
+    placeholder values shared by every record of a campaign
+
+    built once when a campaign starts, so the derived dates are computed a
+    single time and stay the same for the whole run, even if it crosses
+    midnight. per-record values are layered on top with layer()
+    """
+
+    # placeholder names the context fills
+    PLACEHOLDERS = frozenset({"power_hour_date", "deadline_date"})
+
+    def __init__(self, started_at=None):
+        self.started_at = started_at or datetime.now()
+
+        power_hour_date = self.started_at + timedelta(days=POWER_HOUR_DAYS)
+        deadline_date = self.started_at + timedelta(days=DEADLINE_DAYS)
+
+        self.values = {
+            "{power_hour_date}": power_hour_date.strftime(DATE_FORMAT),
+            "{deadline_date}": deadline_date.strftime(DATE_FORMAT),
+        }
+
+    def layer(self, record_values):
+        # record values win over the campaign-wide ones
+        return ChainMap(record_values, self.values)
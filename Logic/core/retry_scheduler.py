@@ -0,0 +1,88 @@
+import heapq
+import itertools
+import random
+import smtplib
+import threading
+import time
+
+TRANSIENT = "transient"  # 4xx reply, worth retrying
+PERMANENT = "permanent"  # 5xx reply, retrying will not help
+OTHER = "other"  # no SMTP reply (template, network or local errors)
+
+FAILURE_CLASS_LABELS = {
+    TRANSIENT: "Transient (4xx, retries exhausted)",
+    PERMANENT: "Permanent (5xx)",
+    OTHER: "Other errors",
+}
+
+
+def reply_code(error):
+    # extract the SMTP reply code from an smtplib exception, if any
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return codes[0] if codes else None
+    return getattr(error, "smtp_code", None)
+
+
+def classify_failure(error):
+    code = reply_code(error)
+    if code is None:
+        return OTHER
+    if 400 <= code < 500:
+        return TRANSIENT
+    if 500 <= code < 600:
+        return PERMANENT
+    return OTHER
+
+
+class RetryScheduler:
+    """
+    delayed retry queue ordered by next-attempt time (min-heap)
+    delays grow exponentially per attempt with "equal jitter", so retries
+    of a throttled batch do not all land on the server at once
+    """
+
+    def __init__(
+        self, max_attempts=4, base_delay=2.0, max_delay=300.0, clock=time.monotonic
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._heap = []
+        self._counter = itertools.count()  # tie-breaker, items are not comparable
+        self._lock = threading.Lock()
+
+    def schedule(self, item, attempt):
+        # queue item for another attempt; False once attempts are used up
+        if attempt >= self.max_attempts:
+            return False
+
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = delay / 2 + random.uniform(0, delay / 2)
+
+        with self._lock:
+            heapq.heappush(
+                self._heap,
+                (self._clock() + delay, next(self._counter), attempt, item),
+            )
+        return True
+
+    def pop_due(self):
+        # return (item, attempt) for the earliest retry that is due, else None
+        with self._lock:
+            if self._heap and self._heap[0][0] <= self._clock():
+                _, _, attempt, item = heapq.heappop(self._heap)
+                return item, attempt
+        return None
+
+    def next_due_in(self):
+        # seconds until the earliest retry is due, or None if none are queued
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - self._clock())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
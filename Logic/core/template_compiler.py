@@ -0,0 +1,45 @@
+import re
+from functools import lru_cache
+
+PLACEHOLDER_PATTERN = re.compile(r"\{([^{}]*)\}")
+_MISSING = object()
+
+
+class CompiledTemplate:
+    """
+    template text parsed once into literal and placeholder segments
+
+    render() walks the segments in a single pass and only looks up the
+    placeholders the template actually uses. unknown placeholders are left
+    in the output as-is, like the str.replace based renderer did
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.segments = []  # (literal, "{name}" or None)
+
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            self.segments.append((text[position : match.start()], match.group(0)))
+            position = match.end()
+        self.segments.append((text[position:], None))
+
+        self.placeholders = frozenset(
+            key[1:-1] for _, key in self.segments if key is not None
+        )
+
+    def render(self, values):
+        # values maps "{name}" keys to replacement values
+        parts = []
+        for literal, key in self.segments:
+            parts.append(literal)
+            if key is not None:
+                value = values.get(key, _MISSING)
+                parts.append(key if value is _MISSING else str(value))
+        return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def compile_template(text):
+    # templates are cached by their text, so an edited template recompiles
+    return CompiledTemplate(text or "")
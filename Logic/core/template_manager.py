@@ -1,10 +1,20 @@
 import json
 import os
-from datetime import datetime, timedelta
+from core.category_rules import CategoryRules
+from core.render_context import (
+    DERIVED_PLACEHOLDERS,
+    NUMERIC_PLACEHOLDERS,
+    RenderContext,
+)
+from core.template_compiler import compile_template
 
 
 class TemplateManager:
-    def __init__(self):
+    # placeholders _generate_replacements derives from a record for previews
+    PREVIEW_PLACEHOLDERS = NUMERIC_PLACEHOLDERS | {"first_name", "name", "email"}
+
+    def __init__(self, category_rules=None):
+        self.category_rules = category_rules or CategoryRules.from_file()
         self.email_templates = {
             "significantly": {
                 "subject": "Attendance and OTJ Logging - Action Required",
@@ -69,7 +79,9 @@ Your coach,""",
         }
 
         self.templates_file = "email_templates.json"
+        self.template_placeholders = {}  # template name -> placeholder names
         self.load_templates()
+        self._index_placeholders()
 
     def load_templates(self):
         # load templates from file
@@ -84,6 +96,23 @@ Your coach,""",
             except Exception as e:
                 print(f"Error loading templates: {e}")
 
+    def _index_placeholders(self, template_name=None):
+        # record which placeholders each template (or just template_name) uses
+        names = [template_name] if template_name else self.email_templates
+        for name in names:
+            template = self.email_templates[name]
+            self.template_placeholders[name] = (
+                compile_template(template["subject"]).placeholders
+                | compile_template(template["body"]).placeholders
+            )
+
+    def get_template_placeholders(self, template_name):
+        return self.template_placeholders.get(template_name, frozenset())
+
+    def get_all_placeholders(self):
+        # every placeholder name used by any template
+        return frozenset().union(*self.template_placeholders.values())
+
     def _validate_template_structure(self, template):
         # validate that a template has the required structure
         return (
@@ -114,6 +143,7 @@ Your coach,""",
             return False, "Subject and body cannot be empty"
 
         self.email_templates[template_name] = {"subject": subject, "body": body}
+        self._index_placeholders(template_name)
         success = self.save_templates()
         return success, (
             "Template updated successfully" if success else "Failed to save template"
@@ -131,8 +161,8 @@ Your coach,""",
                 return category
 
         # fallback to manual calculation for backward compatibility
-        hours_behind = record.get("hours_behind", record.get("off_the_job", 0))
-        days_absent = record.get("days_absent", record.get("last_attended", 0))
+        hours_behind = record.get("off_the_job", 0)
+        days_absent = record.get("last_attended", 0)
 
         try:
             hours_behind = int(hours_behind) if hours_behind else 0
@@ -141,75 +171,54 @@ Your coach,""",
             hours_behind = 0
             days_absent = 0
 
-        if hours_behind >= 30 and days_absent > 30:
-            return "significantly"
-        elif hours_behind >= 15:
-            return "moderately"
-        elif hours_behind > 10:
-            return "slightly"
-        else:
-            return "on_track"
+        return self.category_rules.categorize(hours_behind, days_absent)
 
-    def replace_placeholders(self, text, record):
+    def replace_placeholders(self, text, record, context=None):
         # replace placeholders in email template with actual data
         if not text:
             return ""
 
-        replacements = self._generate_replacements(record)
-
-        result = text
-        for placeholder, value in replacements.items():
-            result = result.replace(placeholder, str(value))
+        # context holds the campaign-wide values; previews get a fresh one
+        context = context or RenderContext()
+        template = compile_template(text)
+        values = context.layer(
+            self._generate_replacements(record, template.placeholders)
+        )
 
-        return result
+        # single pass over the compiled (cached) template
+        return template.render(values)
 
-    def _generate_replacements(self, record):
-        # generate replacement dictionary for placeholders
+    def _generate_replacements(self, record, placeholders=None):
+        """
+        generate replacement dictionary for placeholders
+        only the placeholder names given are computed (all of them if None)
+        """
         replacements = {}
+        needed = placeholders
+        if placeholders is None:
+            needed = self.PREVIEW_PLACEHOLDERS
+            placeholders = record.keys()
 
         # Direct field replacements
-        for key, value in record.items():
-            placeholder = f"{{{key}}}"
-            replacements[placeholder] = str(value) if value is not None else ""
-
-        # calculated/derived replacements
-        current_date = datetime.now()
-
-        # power hour date (5 days from today) - matching sample logic
-        power_hour_date = current_date + timedelta(days=5)
-        replacements["{power_hour_date}"] = power_hour_date.strftime("%Y-%m-%d")
-
-        # deadline date (one week from today)
-        deadline_date = current_date + timedelta(days=7)
-        replacements["{deadline_date}"] = deadline_date.strftime("%Y-%m-%d")
-
-        # handle name fields with priority for first_name
-        first_name = record.get("first_name", "")
-        if not first_name:
-            # fallback to full name and extract first name
-            full_name = record.get("name", record.get("Name", "there"))
-            first_name = (
-                full_name.split()[0] if full_name and full_name != "there" else "there"
-            )
-
-        replacements["{first_name}"] = first_name
-        replacements["{name}"] = record.get("name", record.get("Name", first_name))
-
-        # email field
-        replacements["{email}"] = record.get(
-            "email", record.get("Email", record.get("email_address", ""))
-        )
-
-        # handle hours and days with better formatting
-        hours_behind = record.get("off_the_job", record.get("hours_behind", 0))
-        days_absent = record.get("last_attended", record.get("days_absent", 0))
-
-        try:
-            hours_behind = int(hours_behind) if hours_behind else 0
-            days_absent = int(days_absent) if days_absent else 0
-        except (ValueError, TypeError):
-            hours_behind = 0
-            days_absent = 0
+        for key in placeholders:
+            if key in record:
+                value = record[key]
+                replacements[f"{{{key}}}"] = str(value) if value is not None else ""
+
+        # canonical fields (aliases and types are resolved at ingest by
+        # DataProcessor.preprocess_data), with defaults for bare records
+        if "first_name" in needed:
+            replacements["{first_name}"] = record.get("first_name", "there")
+        if "name" in needed:
+            replacements["{name}"] = record.get("name", "there")
+        if "email" in needed:
+            replacements["{email}"] = record.get("email", "")
+
+        if needed.isdisjoint(NUMERIC_PLACEHOLDERS):
+            return replacements
+
+        hours_behind = record.get("off_the_job", 0)
+        days_absent = record.get("last_attended", 0)
 
         replacements["{off_the_job}"] = str(hours_behind)
         replacements["{hours_behind}"] = str(hours_behind)
@@ -222,8 +231,26 @@ Your coach,""",
 
         return replacements
 
-    def validate_template(self, template_name):
-        # validate that a template has required fields
+    def get_unresolved_placeholders(self, template_name, columns=()):
+        """
+        placeholders of a template that neither a data column nor a derived
+        value can fill (they would be sent verbatim)
+        """
+        # derived here for previews or by EmailManager when sending
+        available = (
+            self.PREVIEW_PLACEHOLDERS
+            | DERIVED_PLACEHOLDERS
+            | RenderContext.PLACEHOLDERS
+            | set(columns)
+        )
+        return sorted(self.get_template_placeholders(template_name) - available)
+
+    def validate_template(self, template_name, columns=None):
+        """
+        validate that a template has required fields
+        columns are the loaded data's columns; without them only derived
+        placeholders count as resolvable
+        """
         template = self.get_template(template_name)
 
         if not template:
@@ -235,6 +262,15 @@ Your coach,""",
         if not template.get("body"):
             return False, f"Template '{template_name}' missing body"
 
+        unresolved = self.get_unresolved_placeholders(template_name, columns or ())
+        if unresolved:
+            placeholders = ", ".join(f"{{{name}}}" for name in unresolved)
+            return (
+                False,
+                f"Template '{template_name}' has placeholders with no matching"
+                f" data: {placeholders}",
+            )
+
         return True, "Template is valid"
 
     def get_template_preview(self, template_name, sample_record=None):
@@ -248,6 +284,7 @@ Your coach,""",
         if not sample_record:
             sample_record = {
                 "name": "old new",
+                "first_name": "old",
                 "email": "old.new@gmail.com",
                 "off_the_job": 25,
                 "last_attended": 15,
@@ -284,6 +321,7 @@ Your coach,""",
                     return False, f"Invalid template format for '{name}'"
 
             self.email_templates.update(imported_templates)
+            self._index_placeholders()
             self.save_templates()
 
             return True, f"Templates imported from {file_path}"
@@ -0,0 +1,126 @@
+import os
+import smtplib
+import socket
+import threading
+import time
+
+# mbox files are shared by every session of a run, so appends are serialised
+_mbox_lock = threading.Lock()
+
+
+class SMTPTransport:
+    # live delivery over an authenticated SMTP session
+    def __init__(self, config):
+        self.config = config
+        self.server = None
+
+    def open(self):
+        self.server = smtplib.SMTP(self.config["smtp_server"], self.config["smtp_port"])
+        if self.config.get("use_tls", True):
+            self.server.starttls()
+        self.server.login(self.config["sender_email"], self.config["sender_password"])
+
+    def send(self, from_addr, to_addr, data):
+        self.server.sendmail(from_addr, to_addr, data)
+
+    def close(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+        self.server = None
+
+
+class NullTransport:
+    # discards every message; benchmarks the pipeline minus the network
+    def __init__(self, config=None):
+        self.messages = 0
+        self.bytes = 0
+
+    def open(self):
+        pass
+
+    def send(self, from_addr, to_addr, data):
+        self.messages += 1
+        self.bytes += len(data)
+
+    def close(self):
+        pass
+
+
+class MaildirTransport:
+    """
+    writes each message into a maildir (tmp/ then renamed into new/)
+    the file holds exactly the bytes that would have gone over SMTP
+    """
+
+    def __init__(self, config):
+        self.path = config.get("transport_path") or "dry_run_maildir"
+        self._counter = 0
+
+    def open(self):
+        for folder in ("tmp", "new", "cur"):
+            os.makedirs(os.path.join(self.path, folder), exist_ok=True)
+
+    def send(self, from_addr, to_addr, data):
+        self._counter += 1
+        name = (
+            f"{time.time():.6f}.P{os.getpid()}T{threading.get_ident()}"
+            f"Q{self._counter}.{socket.gethostname()}"
+        )
+        tmp_path = os.path.join(self.path, "tmp", name)
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.rename(tmp_path, os.path.join(self.path, "new", name))
+
+    def close(self):
+        pass
+
+
+class MboxTransport:
+    # appends every message to a single mbox file (mboxrd quoting)
+    def __init__(self, config):
+        self.path = config.get("transport_path") or "dry_run.mbox"
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def send(self, from_addr, to_addr, data):
+        body = data.replace(b"\r\n", b"\n")
+        lines = [
+            b">" + line if line.lstrip(b">").startswith(b"From ") else line
+            for line in body.split(b"\n")
+        ]
+        envelope = f"From {from_addr or 'MAILER-DAEMON'} {time.asctime()}\n"
+
+        with _mbox_lock:
+            with open(self.path, "ab") as f:
+                f.write(envelope.encode("utf-8"))
+                f.write(b"\n".join(lines).rstrip(b"\n"))
+                f.write(b"\n\n")
+
+    def close(self):
+        pass
+
+
+TRANSPORTS = {
+    "smtp": SMTPTransport,
+    "maildir": MaildirTransport,
+    "mbox": MboxTransport,
+    "null": NullTransport,
+}
+
+
+def create_transport(config):
+    # build the transport named by config["transport"] (default "smtp")
+    kind = config.get("transport", "smtp")
+    if kind not in TRANSPORTS:
+        raise ValueError(f"Unknown transport: {kind}")
+    return TRANSPORTS[kind](config)
@@ -1,12 +1,27 @@
+import os
+import threading
+
 import customtkinter as ctk
 from tkinter import filedialog, messagebox, ttk
 
+from core.data_processor import LOAD_PHASES
+from ui.progress_pump import ProgressPump
+
+PHASE_LABELS = {
+    "parse": "Reading file",
+    "clean": "Cleaning",
+    "categorise": "Categorising",
+    "index": "Indexing",
+}
+
 
 class FileUploadTab:
     def __init__(self, parent, data_processor, callback=None):
         self.parent = parent
         self.data_processor = data_processor
         self.callback = callback
+        self.cancel_event = None
+        self.progress_pump = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -20,7 +35,7 @@ class FileUploadTab:
         )
 
         upload_label.pack(pady=(20, 10))
-        upload_button = ctk.CTkButton(
+        self.upload_button = ctk.CTkButton(
             upload_frame,
             text="Choose File",
             command=self.upload_file,
@@ -28,12 +43,29 @@ class FileUploadTab:
             height=40,
         )
 
-        upload_button.pack(pady=10)
+        self.upload_button.pack(pady=10)
+
+        # compare a new weekly export with the data already loaded
+        self.compare_var = ctk.BooleanVar(value=False)
+        compare_checkbox = ctk.CTkCheckBox(
+            upload_frame,
+            text="Compare with previous upload",
+            variable=self.compare_var,
+        )
+        compare_checkbox.pack(pady=5)
+
         self.file_label = ctk.CTkLabel(
             upload_frame, text="No file selected", font=ctk.CTkFont(size=12)
         )
         self.file_label.pack(pady=(5, 20))
 
+        # loading progress, only shown while a file loads
+        self.load_progress = ctk.CTkProgressBar(upload_frame, width=300)
+        self.load_label = ctk.CTkLabel(upload_frame, text="", font=ctk.CTkFont(size=12))
+        self.cancel_button = ctk.CTkButton(
+            upload_frame, text="Cancel", command=self.cancel_loading, width=100
+        )
+
         # data preview section
         preview_frame = ctk.CTkFrame(self.parent)
         preview_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
@@ -57,15 +89,102 @@ class FileUploadTab:
             ],
         )
         if file_path:
-            success, message = self.data_processor.load_file(file_path)
+            self.start_loading(file_path)
+
+    def start_loading(self, file_path):
+        """Load a file on a worker thread, keeping the window responsive"""
+        self.cancel_event = threading.Event()
+        self.upload_button.configure(state="disabled")
+        self.file_label.configure(text=f"Loading {os.path.basename(file_path)}...")
+
+        self.load_progress.set(0)
+        self.load_label.configure(text="")
+        for widget in (self.load_progress, self.load_label, self.cancel_button):
+            widget.pack(pady=5, before=self.file_label)
+
+        self.progress_pump = ProgressPump(self.parent, self.update_loading_progress)
+        self.progress_pump.start()
+
+        # Tk variables are read here, on the main loop, not in the worker
+        threading.Thread(
+            target=self._load_file_thread,
+            args=(
+                file_path,
+                self.compare_var.get(),
+                self.cancel_event,
+                self.progress_pump,
+            ),
+            daemon=True,
+        ).start()
+
+    def _load_file_thread(self, file_path, incremental, cancel_event, progress_pump):
+        """Load and preprocess a file in a separate thread"""
+
+        def report(phase, rows):
+            progress_pump.push(
+                LOAD_PHASES.index(phase),
+                len(LOAD_PHASES),
+                f"{PHASE_LABELS[phase]}... {rows:,} rows",
+            )
+
+        success, message = self.data_processor.load_file(
+            file_path,
+            incremental=incremental,
+            progress_callback=report,
+            cancel_event=cancel_event,
+        )
+        self.parent.after(
+            0, lambda: self.on_loading_complete(success, message, cancel_event)
+        )
+
+    def update_loading_progress(self, phase, phases, text):
+        """Show the current load phase (called on the main loop, once per frame)"""
+        self.load_progress.set(phase / phases)
+        self.load_label.configure(text=text)
+
+    def cancel_loading(self):
+        """
+        Stop waiting for the current load. The worker stops at its next
+        checkpoint and the previously loaded data is kept
+        """
+        if self.cancel_event is None:
+            return
+        self.cancel_event.set()
+        self._finish_loading()
+
+    def on_loading_complete(self, success, message, cancel_event):
+        """Handle the end of a load"""
+        if cancel_event is not self.cancel_event:
+            # cancelled; if that came too late to stop it, the file is loaded
             if success:
-                self.file_label.configure(text=self.data_processor.get_file_info())
-                self.create_data_preview()
-                messagebox.showinfo("Success", message)
-                if self.callback:
-                    self.callback()
-            else:
-                messagebox.showerror("Error", message)
+                self.show_loaded_data()
+            return
+        self._finish_loading()
+
+        if success:
+            self.show_loaded_data()
+            messagebox.showinfo("Success", message)
+        else:
+            messagebox.showerror("Error", message)
+
+    def show_loaded_data(self):
+        """Refresh the file info, preview and the other tabs"""
+        if self.cancel_event is None:
+            self.file_label.configure(text=self.data_processor.get_file_info())
+        self.create_data_preview()
+        if self.callback:
+            self.callback()
+
+    def _finish_loading(self):
+        self.cancel_event = None
+        if self.progress_pump:
+            self.progress_pump.stop()
+            self.progress_pump = None
+
+        for widget in (self.load_progress, self.load_label, self.cancel_button):
+            widget.pack_forget()
+        self.upload_button.configure(state="normal")
+        self.file_label.configure(text=self.data_processor.get_file_info())
 
     def create_data_preview(self):
         # clear existing tree
@@ -6,6 +6,7 @@ from ui.file_upload_tab import FileUploadTab
 from ui.templates_tab import TemplatesTab
 from ui.send_emails_tab import SendEmailsTab
 from ui.status_tab import StatusTab
+from core.category_rules import CategoryRules
 from core.email_manager import EmailManager
 from core.data_processor import DataProcessor
 from core.template_manager import TemplateManager
@@ -33,9 +34,14 @@ class MainWindow:
         self.root.minsize(min_width, min_height)
 
         # initialize core components
-        self.email_manager = EmailManager()
-        self.data_processor = DataProcessor()
-        self.template_manager = TemplateManager()
+        # one rule table shared by categorisation and template selection
+        self.category_rules = CategoryRules.from_file()
+        self.email_manager = EmailManager(category_rules=self.category_rules)
+        self.data_processor = DataProcessor(category_rules=self.category_rules)
+        self.template_manager = TemplateManager(category_rules=self.category_rules)
+
+        # only columns the preprocessing or the templates use are loaded
+        self.data_processor.template_fields = self.template_manager.get_all_placeholders
 
         # initialize UI components
         self.splash_screen = None
@@ -105,7 +111,9 @@ class MainWindow:
             self.tabview.tab("File Upload"), self.data_processor, self.on_data_updated
         )
         self.templates_tab = TemplatesTab(
-            self.tabview.tab("Email Templates"), self.template_manager
+            self.tabview.tab("Email Templates"),
+            self.template_manager,
+            self.data_processor,
         )
         self.send_emails_tab = SendEmailsTab(
             self.tabview.tab("Send Emails"),
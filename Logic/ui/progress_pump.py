@@ -0,0 +1,61 @@
+from collections import deque
+
+
+class ProgressPump:
+    """
+    hands progress events from sender threads to the Tk main loop
+
+    workers call push() from any thread. it appends to a single-slot deque,
+    which is atomic and needs no lock, and each new event overwrites the
+    previous one. the main loop drains the slot via after() at a fixed
+    frame rate and applies only the latest state, so UI cost stays the same
+    no matter how fast emails are sent
+    """
+
+    def __init__(self, widget, on_progress, on_frame=None, interval_ms=50):
+        self.widget = widget
+        self.on_progress = on_progress
+        self.on_frame = on_frame
+        self.interval_ms = interval_ms
+
+        self._latest = deque(maxlen=1)
+        self._after_id = None
+        self._running = False
+
+    def push(self, current, total, current_email=""):
+        # safe to call from worker threads
+        self._latest.append((current, total, current_email))
+
+    def start(self):
+        self._running = True
+        self._schedule()
+
+    def stop(self):
+        # stop polling and apply whatever arrived after the last frame
+        self._running = False
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._drain()
+
+    def _schedule(self):
+        self._after_id = self.widget.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        self._drain()
+        if self._running:
+            self._schedule()
+
+    def _drain(self):
+        try:
+            current, total, current_email = self._latest.pop()
+        except IndexError:
+            return
+
+        self.on_progress(current, total, current_email)
+        if self.on_frame:
+            self.on_frame()
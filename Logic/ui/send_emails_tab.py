@@ -1,7 +1,14 @@
 import customtkinter as ctk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
 import threading
+import pandas as pd
 from ui.sending_splash import SendingSplash
+from ui.progress_pump import ProgressPump
+from core.batch_renderer import render_dataframe
+from core.outbox import default_outbox_path
+from core.render_context import RenderContext
+from core.rate_limiter import RATE_PROFILES
+from core.transports import TRANSPORTS
 
 
 class SendEmailsTab:
@@ -18,10 +25,16 @@ class SendEmailsTab:
         self.smtp_port = None
         self.sender_email = None
         self.sender_password = None
+        self.pool_size = None
+        self.rate_profile = None
+        self.transport = None
         self.send_progress = None
         self.progress_label = None
         self.send_button = None
+        self.resume_button = None
+        self.worsened_button = None
         self.sending_splash = None
+        self.progress_pump = None
 
         # Category-specific UI elements
         self.category_frames = {}
@@ -82,6 +95,31 @@ class SendEmailsTab:
         )
         self.sender_password.grid(row=1, column=3, padx=10, pady=5, sticky="ew")
 
+        # Number of parallel SMTP sessions
+        ctk.CTkLabel(smtp_frame, text="Connections:").grid(
+            row=2, column=0, padx=10, pady=5, sticky="w"
+        )
+        self.pool_size = ctk.CTkEntry(smtp_frame, placeholder_text="1", width=80)
+        self.pool_size.grid(row=2, column=1, padx=10, pady=5, sticky="w")
+
+        # Provider sending limits
+        ctk.CTkLabel(smtp_frame, text="Rate Profile:").grid(
+            row=2, column=2, padx=10, pady=5, sticky="w"
+        )
+        self.rate_profile = ctk.CTkOptionMenu(
+            smtp_frame, values=list(RATE_PROFILES.keys())
+        )
+        self.rate_profile.set("default")
+        self.rate_profile.grid(row=2, column=3, padx=10, pady=5, sticky="ew")
+
+        # Delivery transport (smtp, or a local sink for dry runs)
+        ctk.CTkLabel(smtp_frame, text="Delivery:").grid(
+            row=3, column=0, padx=10, pady=5, sticky="w"
+        )
+        self.transport = ctk.CTkOptionMenu(smtp_frame, values=list(TRANSPORTS.keys()))
+        self.transport.set("smtp")
+        self.transport.grid(row=3, column=1, padx=10, pady=5, sticky="w")
+
         smtp_frame.grid_columnconfigure(1, weight=1)
         smtp_frame.grid_columnconfigure(3, weight=1)
 
@@ -120,7 +158,38 @@ class SendEmailsTab:
             height=40,
             font=ctk.CTkFont(size=14, weight="bold"),
         )
-        self.send_button.pack(pady=20)
+        self.send_button.pack(pady=(20, 5))
+
+        # Only apprentices whose category got worse since the previous upload
+        self.worsened_button = ctk.CTkButton(
+            send_all_frame,
+            text="Send To Worsened Only",
+            command=self.send_worsened_emails,
+            width=200,
+            height=30,
+            state="disabled",
+        )
+        self.worsened_button.pack(pady=5)
+
+        # Resume a campaign that was interrupted before it finished
+        self.resume_button = ctk.CTkButton(
+            send_all_frame,
+            text="Resume Interrupted Campaign",
+            command=self.resume_campaign,
+            width=200,
+            height=30,
+        )
+        self.resume_button.pack(pady=5)
+
+        # Send straight from a large export without loading it first
+        self.stream_button = ctk.CTkButton(
+            send_all_frame,
+            text="Send From Large File...",
+            command=self.send_from_file,
+            width=200,
+            height=30,
+        )
+        self.stream_button.pack(pady=(5, 20))
 
         # Category-specific sections
         self.setup_category_sections(main_scrollable)
@@ -239,9 +308,9 @@ class SendEmailsTab:
             self.progress_label.configure(text=f"Ready to send {total_count} emails")
 
             # Update category counts
+            counts = self.data_processor.get_category_counts()
             for category in ["significantly", "moderately", "slightly"]:
-                category_data = self.get_category_data(category)
-                count = len(category_data)
+                count = counts.get(category, 0)
 
                 count_label = self.category_labels.get(f"{category}_count")
                 if count_label:
@@ -263,9 +332,19 @@ class SendEmailsTab:
 
             # Enable/disable the main send button
             self.send_button.configure(state="normal")
+
+            # Worsened apprentices from the last incremental upload, if any
+            worsened = self.data_processor.get_diff_counts()["worsened"]
+            self.worsened_button.configure(
+                text=f"Send To Worsened Only ({worsened})",
+                state="normal" if worsened > 0 else "disabled",
+            )
         else:
             self.progress_label.configure(text="No data loaded")
             self.send_button.configure(state="disabled")
+            self.worsened_button.configure(
+                text="Send To Worsened Only", state="disabled"
+            )
 
             # Reset all category displays
             for category in ["significantly", "moderately", "slightly"]:
@@ -283,18 +362,35 @@ class SendEmailsTab:
 
     def send_all_emails(self):
         """Send emails to all categories"""
-        if not self.data_processor.get_processed_data():
+        data, frame = self.data_processor.get_snapshot()
+        if not data:
             messagebox.showerror("Error", "Please upload a data file first!")
             return
 
         if not self._validate_smtp_config():
             return
 
-        self._initiate_email_sending(self.data_processor.get_processed_data(), "All")
+        self._initiate_email_sending(data, "All", frame=frame)
+
+    def send_worsened_emails(self):
+        """Send emails to apprentices whose category worsened since last upload"""
+        worsened_data = self.data_processor.get_diff_data("worsened")
+
+        if not worsened_data:
+            messagebox.showwarning(
+                "Warning", "No apprentices got worse since the previous upload!"
+            )
+            return
+
+        if not self._validate_smtp_config():
+            return
+
+        self._initiate_email_sending(worsened_data, "Worsened")
 
     def send_category_emails(self, category):
         """Send emails to a specific category"""
-        category_data = self.get_category_data(category)
+        # the records and their DataFrame rows come from the same load
+        category_data, frame = self.data_processor.get_snapshot(category)
 
         if not category_data:
             messagebox.showwarning(
@@ -312,65 +408,188 @@ class SendEmailsTab:
         }
 
         category_name = category_names.get(category, category)
-        self._initiate_email_sending(category_data, category_name, category)
+        self._initiate_email_sending(category_data, category_name, category, frame)
 
     def _validate_smtp_config(self):
         """Validate SMTP configuration"""
+        if self.transport.get() != "smtp":
+            # dry runs only need a sender address for the From header
+            if not self.sender_email.get():
+                messagebox.showerror("Error", "Please enter a sender email!")
+                return False
+            return True
+
         if not self.sender_email.get() or not self.sender_password.get():
             messagebox.showerror("Error", "Please enter email credentials!")
             return False
         return True
 
-    def _initiate_email_sending(self, data, category_name, category_id=None):
-        """Initiate the email sending process"""
-        # Configure email manager
-        config = {
+    def resume_campaign(self):
+        """Resume the most recent campaign with unsent or failed messages"""
+        if not self._validate_smtp_config():
+            return
+
+        self.email_manager.configure(self._get_smtp_config())
+        campaigns = self.email_manager.get_unfinished_campaigns(include_failed=True)
+        if not campaigns:
+            messagebox.showinfo("Resume Campaign", "No interrupted campaigns found.")
+            return
+
+        campaign = campaigns[0]
+        answer = messagebox.askyesnocancel(
+            "Resume Campaign",
+            f"Resume the campaign started {campaign['created_at'][:19]}?\n\n"
+            f"{campaign['unfinished']} of {campaign['total']} emails were not sent "
+            "or failed.\n\nChoose No to dismiss the campaign instead.",
+        )
+        if answer is None:
+            return
+        if not answer:
+            self.email_manager.dismiss_campaign(campaign["campaign_id"])
+            return
+
+        self.sending_splash = SendingSplash(
+            self.parent, self.on_sending_complete, title="Resuming Campaign"
+        )
+        self._start_progress_pump()
+
+        threading.Thread(
+            target=self._resume_campaign_thread,
+            args=(campaign["campaign_id"],),
+            daemon=True,
+        ).start()
+
+    def send_from_file(self):
+        """Stream every record of a file into the sender, chunk by chunk"""
+        if not self._validate_smtp_config():
+            return
+
+        file_path = filedialog.askopenfilename(
+            title="Select Apprentice Data File",
+            filetypes=[
+                ("All Supported Files", "*.xlsx *.csv"),
+                ("Excel files", "*.xlsx"),
+                ("CSV files", "*.csv"),
+            ],
+        )
+        if not file_path:
+            return
+
+        if not messagebox.askyesno(
+            "Send From File",
+            "Send an email to every apprentice in this file?\n\n"
+            "The file is read in chunks while sending, so large exports "
+            "start sending straight away.",
+        ):
+            return
+
+        self.email_manager.configure(self._get_smtp_config())
+        self.sending_splash = SendingSplash(
+            self.parent, self.on_sending_complete, title="Sending From File"
+        )
+        self._start_progress_pump()
+
+        threading.Thread(
+            target=self._send_from_file_thread, args=(file_path,), daemon=True
+        ).start()
+
+    def _send_from_file_thread(self, file_path):
+        """Stream a file into the email manager in a separate thread"""
+        try:
+            self.email_manager.send_stream(
+                self.data_processor.iter_chunks(file_path),
+                self.template_manager.get_all_templates(),
+                progress_callback=self.progress_pump.push,
+            )
+        except Exception as e:
+            self.parent.after(
+                0,
+                lambda: messagebox.showerror(
+                    "Error", f"Failed to send emails: {str(e)}"
+                ),
+            )
+        finally:
+            self.parent.after(0, self.on_sending_complete)
+
+    def _resume_campaign_thread(self, campaign_id):
+        """Resume a campaign in a separate thread"""
+        try:
+            self.email_manager.resume_campaign(
+                campaign_id,
+                self.template_manager.get_all_templates(),
+                progress_callback=self.progress_pump.push,
+                include_failed=True,
+            )
+        except Exception as e:
+            self.parent.after(
+                0,
+                lambda: messagebox.showerror(
+                    "Error", f"Failed to resume campaign: {str(e)}"
+                ),
+            )
+        finally:
+            self.parent.after(0, self.on_sending_complete)
+
+    def _get_smtp_config(self):
+        """Build the email manager configuration from the form"""
+        return {
             "smtp_server": self.smtp_server.get() or "smtp.gmail.com",
             "smtp_port": int(self.smtp_port.get() or "587"),
             "sender_email": self.sender_email.get(),
             "sender_password": self.sender_password.get(),
+            "pool_size": int(self.pool_size.get() or "1"),
+            "rate_profile": self.rate_profile.get(),
+            # dry runs are not resumable, so they keep no send state
+            "outbox_path": (
+                default_outbox_path() if self.transport.get() == "smtp" else None
+            ),
+            "transport": self.transport.get(),
+            "transport_path": {
+                "maildir": "dry_run_maildir",
+                "mbox": "dry_run.mbox",
+            }.get(self.transport.get()),
         }
 
-        self.email_manager.configure(config)
+    def _initiate_email_sending(
+        self, data, category_name, category_id=None, frame=None
+    ):
+        """Initiate the email sending process"""
+        # Configure email manager
+        self.email_manager.configure(self._get_smtp_config())
 
         # Show sending splash
         self.sending_splash = SendingSplash(
             self.parent,
             lambda: self.on_sending_complete(category_id),
-            title=f"Sending {category_name} Emails"
+            title=f"Sending {category_name} Emails",
         )
+        self._start_progress_pump(category_id)
 
         # Start sending in a separate thread
         threading.Thread(
-            target=self._send_emails_thread, args=(data, category_id), daemon=True
+            target=self._send_emails_thread,
+            args=(data, category_id, frame),
+            daemon=True,
         ).start()
 
-    def _send_emails_thread(self, data, category_id=None):
+    def _send_emails_thread(self, data, category_id=None, frame=None):
         """Send emails in a separate thread"""
         try:
             # Get templates - prepare all templates for bulk sending
             templates = self.template_manager.get_all_templates()
 
-            # Filter data based on category if specified
-            if category_id:
-                # When sending category-specific emails, only send to that category
-                filtered_data = [
-                    record
-                    for record in data
-                    if self.template_manager.determine_template_type(record)
-                    == category_id
-                ]
-            else:
-                # When sending all emails, include all data
-                filtered_data = data
+            # The batch and any record rendered while sending share one set
+            # of dates
+            context = RenderContext()
+            rendered = self._render_batch(data, templates, context, frame)
 
             # Send bulk emails using the email manager
             self.email_manager.send_bulk_emails(
-                filtered_data,
+                data,
                 templates,
-                progress_callback=lambda current, total, email: self.update_sending_progress(
-                    current, total, email, category_id
-                ),
+                progress_callback=self.progress_pump.push,
+                rendered=rendered,
+                context=context,
             )
 
         except Exception as e:
@@ -384,10 +603,40 @@ class SendEmailsTab:
         finally:
             self.parent.after(0, lambda: self.on_sending_complete(category_id))
 
+    def _render_batch(self, data, templates, context, frame=None):
+        """Render subjects and bodies for the records column-wise"""
+        if not data:
+            return None
+
+        # frame holds the same rows as data when taken from the loaded
+        # DataFrame; other record lists are framed here
+        if frame is None:
+            frame = pd.DataFrame(data)
+
+        try:
+            return render_dataframe(
+                frame, templates, context, rules=self.email_manager.category_rules
+            )
+        except Exception as e:
+            # fall back to rendering each record while sending
+            print(f"Batch render failed: {e}")
+            return None
+
+    def _start_progress_pump(self, category_id=None):
+        """Route progress from the sender threads through the Tk main loop"""
+        self.progress_pump = ProgressPump(
+            self.parent,
+            lambda current, total, email: self.update_sending_progress(
+                current, total, email, category_id
+            ),
+            on_frame=self.status_callback,
+        )
+        self.progress_pump.start()
+
     def update_sending_progress(
         self, current, total, current_email="", category_id=None
     ):
-        """Update sending progress"""
+        """Update sending progress (called on the main loop, once per frame)"""
         if self.sending_splash:
             self.sending_splash.update_progress(current, total, current_email)
 
@@ -407,11 +656,15 @@ class SendEmailsTab:
             self.send_progress.set(progress)
             self.progress_label.configure(text=f"Sending... {current}/{total}")
 
+    def on_sending_complete(self, category_id=None):
+        """Handle sending completion"""
+        if self.progress_pump:
+            self.progress_pump.stop()
+            self.progress_pump = None
+
         if self.status_callback:
             self.status_callback()
 
-    def on_sending_complete(self, category_id=None):
-        """Handle sending completion"""
         if self.sending_splash:
             self.sending_splash.close()
             self.sending_splash = None
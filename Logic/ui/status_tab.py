@@ -1,5 +1,6 @@
 import customtkinter as ctk
 from datetime import datetime
+from core.retry_scheduler import FAILURE_CLASS_LABELS
 
 
 class StatusTab:
@@ -104,6 +105,14 @@ class StatusTab:
             success_rate = status["sent"] / status["total"] * 100
             report += f"Success rate: {success_rate:.1f}%\n\n"
 
+        breakdown = self.email_manager.get_failure_breakdown()
+        if breakdown:
+            report += "Failures by class:\n"
+            for failure_class, count in breakdown.items():
+                label = FAILURE_CLASS_LABELS.get(failure_class, failure_class)
+                report += f"- {label}: {count}\n"
+            report += "\n"
+
         if status["failed"] > 0:
             report += "Failed emails may be due to:\n"
             report += "- Invalid email addresses\n"
@@ -3,9 +3,10 @@ from tkinter import messagebox
 
 
 class TemplatesTab:
-    def __init__(self, parent, template_manager):
+    def __init__(self, parent, template_manager, data_processor=None):
         self.parent = parent
         self.template_manager = template_manager
+        self.data_processor = data_processor
 
         self.setup_ui()
 
@@ -85,9 +86,33 @@ class TemplatesTab:
         subject = self.subject_entry.get()
         body = self.body_text.get("1.0", "end-1c")
 
-        if self.template_manager.update_template(template_name, subject, body):
+        success, message = self.template_manager.update_template(
+            template_name, subject, body
+        )
+        if not success:
+            messagebox.showerror("Error", f"Failed to save template! {message}")
+            return
+
+        # a pruned load lacks columns only this edit started using
+        if self.data_processor is not None:
+            loaded, message = self.data_processor.add_template_columns()
+            if not loaded:
+                messagebox.showerror("Error", message)
+
+        # warn about placeholders the loaded data cannot fill
+        valid, message = self.template_manager.validate_template(
+            template_name, self._data_columns()
+        )
+        if valid:
             messagebox.showinfo(
                 "Success", f"Template '{template_name}' saved successfully!"
             )
         else:
-            messagebox.showerror("Error", "Failed to save template!")
+            messagebox.showwarning("Template saved", message)
+
+    def _data_columns(self):
+        # columns of the loaded data, if any
+        if self.data_processor is None:
+            return None
+        dataframe = self.data_processor.get_dataframe()
+        return None if dataframe is None else list(dataframe.columns)